@@ -9,6 +9,29 @@ import os
 import re
 from pathlib import Path
 
+TUNED_CONFIDENCE = '0.98'
+TUNED_PACKETS = '500'
+
+# Single pass over traffic_analyzer.py; each alternative captures one tuning target
+TUNING_PATTERN = re.compile(
+    r"(?P<conf>min_confidence = detection_config\.get\('confidence_threshold',\s*)(?P<conf_val>[\d.]+)\)"
+    r"|(?P<pkts>min_packet_count = detection_config\.get\('min_packet_threshold',\s*)(?P<pkts_val>\d+)\)"
+    r"|^(?P<indent>[ \t]*)# Layer 6: Threat classification\n"
+    r"(?:[ \t]*#.*\n)*[ \t]*is_threat = threat != '(?:BENIGN|BenignTraffic)'$",
+    re.MULTILINE
+)
+
+IGNORE_CODE = """{indent}# Ignore attack types commonly misclassified on home networks
+{indent}ignored_attack_types = {{
+{indent}    'Mirai-greip_flood',  # Often triggered by gaming/P2P traffic
+{indent}    'DDoS-ICMP_Fragmentation',  # Often triggered by normal fragmentation
+{indent}}}
+{indent}is_ignored_attack = threat in ignored_attack_types
+
+{indent}# Layer 6: Threat classification
+{indent}# Only alert on actual threats, not benign or ignored traffic
+{indent}is_threat = threat != 'BENIGN' and threat != 'BenignTraffic' and not is_ignored_attack"""
+
 def apply_tuning():
     """Apply home network tuning to traffic_analyzer.py"""
 
@@ -25,42 +48,26 @@ def apply_tuning():
     original_content = content
     changes_made = []
 
-    # Change 1: Increase confidence threshold from 95% to 98%
-    old_confidence = "min_confidence = detection_config.get('confidence_threshold', 0.95)"
-    new_confidence = "min_confidence = detection_config.get('confidence_threshold', 0.98)  # Tuned for home network"
-
-    if old_confidence in content:
-        content = content.replace(old_confidence, new_confidence)
-        changes_made.append("✓ Confidence threshold: 95% → 98%")
-
-    # Change 2: Increase packet threshold from 100 to 500
-    old_packets = "min_packet_count = detection_config.get('min_packet_threshold', 100)"
-    new_packets = "min_packet_count = detection_config.get('min_packet_threshold', 500)  # Tuned for home network"
-
-    if old_packets in content:
-        content = content.replace(old_packets, new_packets)
-        changes_made.append("✓ Packet threshold: 100 → 500 packets")
-
-    # Change 3: Add commonly misclassified attack types to ignore
-    # Find the line with "is_threat = threat != 'BENIGN'"
-    if "is_threat = threat != 'BENIGN'" in content:
-        ignore_code = """
-                    # Ignore attack types commonly misclassified on home networks
-                    ignored_attack_types = {
-                        'Mirai-greip_flood',  # Often triggered by gaming/P2P traffic
-                        'DDoS-ICMP_Fragmentation',  # Often triggered by normal fragmentation
-                    }
-                    is_ignored_attack = threat in ignored_attack_types
-
-                    # Layer 6: Threat classification
-                    # Only alert on actual threats, not benign or ignored traffic
-                    is_threat = threat != 'BENIGN' and threat != 'BenignTraffic' and not is_ignored_attack"""
-
-        content = content.replace(
-            "# Layer 6: Threat classification\n                    # Only alert on actual threats, not benign traffic\n                    is_threat = threat != 'BENIGN'",
-            ignore_code
-        )
+    def tune(match):
+        # Change 1: Increase confidence threshold to 98%
+        if match.group('conf') is not None:
+            if match.group('conf_val') == TUNED_CONFIDENCE:
+                return match.group(0)
+            changes_made.append(f"✓ Confidence threshold: {match.group('conf_val')} → {TUNED_CONFIDENCE}")
+            return f"{match.group('conf')}{TUNED_CONFIDENCE})  # Tuned for home network"
+
+        # Change 2: Increase packet threshold to 500
+        if match.group('pkts') is not None:
+            if match.group('pkts_val') == TUNED_PACKETS:
+                return match.group(0)
+            changes_made.append(f"✓ Packet threshold: {match.group('pkts_val')} → {TUNED_PACKETS} packets")
+            return f"{match.group('pkts')}{TUNED_PACKETS})  # Tuned for home network"
+
+        # Change 3: Add commonly misclassified attack types to ignore
         changes_made.append("✓ Ignoring Mirai-greip_flood and DDoS-ICMP_Fragmentation")
+        return IGNORE_CODE.format(indent=match.group('indent'))
+
+    content = TUNING_PATTERN.sub(tune, content)
 
     # Write changes if any were made
     if content != original_content:
@@ -84,8 +91,8 @@ def apply_tuning():
         print("\n" + "="*60)
         print("WHAT THIS MEANS")
         print("="*60)
-        print("- Alerts only trigger at 98% confidence (instead of 95%)")
-        print("- Alerts only trigger after 500 packets (instead of 100)")
+        print("- Alerts only trigger at 98% confidence")
+        print("- Alerts only trigger after 500 packets")
         print("- Mirai and fragmentation attacks ignored (common false positives)")
         print("\nThis should significantly reduce false positives on:")
         print("  • Gaming traffic")
@@ -7,24 +7,44 @@ This will significantly reduce false positives by:
 4. Updating config.yaml with optimal settings
 """
 
-import yaml
-import os
+import re
+
+# Very strict detection settings written into config.yaml
+STRICT_SETTINGS = {
+    'confidence_threshold': '0.98',  # Very high - only super confident detections
+    'min_packet_threshold': '500',   # High - only sustained traffic
+    'anomaly_multiplier': '7.0',     # Higher - reduce anomaly sensitivity
+}
+
+# Matches the value of each indented key in place, leaving comments and ordering intact
+SETTING_PATTERN = re.compile(
+    r"^(?P<prefix>[ \t]+(?P<key>" + "|".join(map(re.escape, STRICT_SETTINGS)) + r"):[ \t]*)[^\s#]+",
+    re.MULTILINE
+)
 
 def apply_strict_tuning():
     config_path = 'config.yaml'
 
-    # Load current config
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        content = f.read()
+
+    # Apply very strict settings with one pass over the file text
+    updated = set()
+
+    def set_value(match):
+        key = match.group('key')
+        updated.add(key)
+        return match.group('prefix') + STRICT_SETTINGS[key]
+
+    content = SETTING_PATTERN.sub(set_value, content)
 
-    # Apply very strict settings
-    config['detection']['confidence_threshold'] = 0.98  # Very high - only super confident detections
-    config['detection']['min_packet_threshold'] = 500   # High - only sustained traffic
-    config['detection']['anomaly_multiplier'] = 7.0     # Higher - reduce anomaly sensitivity
+    missing = set(STRICT_SETTINGS) - updated
+    if missing:
+        print(f"[!] Keys not found in {config_path}: {', '.join(sorted(missing))}")
 
     # Save updated config
     with open(config_path, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        f.write(content)
 
     print("[+] Applied strict tuning to config.yaml:")
     print(f"    - Confidence threshold: 98%")
@@ -11,7 +11,7 @@ How it works:
 4. The retrained model will understand your home network patterns
 
 Usage:
-    python collect_home_network_baseline.py --duration 24 --output data/home_network_baseline.csv
+    python collect_home_network_baseline.py --duration 24 --output data/home_network_baseline.parquet
 """
 
 import argparse
@@ -21,21 +21,78 @@ import numpy as np
 from datetime import datetime, timedelta
 from collections import defaultdict
 import os
+import socket
+import struct
+import threading
 import yaml
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 
-from scapy.all import sniff, IP, TCP, UDP
-from src.data_processing.feature_engineer import engineer_features_from_flow
+from scapy.all import AsyncSniffer, IP, TCP, UDP
+from src.data_processing.feature_engineer import engineer_features_from_arrays
+
+# Fixed-offset header layouts for the raw-socket capture path
+ETH_HEADER_LEN = 14
+ETH_P_IP = 0x0800
+IPV4_HEADER = struct.Struct('!BxHxxHxB2x4s4s')  # ver/ihl, total length, frag, proto, src, dst
+L4_PORTS = struct.Struct('!HH')
+
+
+class FlowState:
+    """Per-flow ring buffers of packet scalars (Structure-of-Arrays)."""
+
+    CAPACITY = 64
+
+    def __init__(self):
+        self.ts = np.empty(self.CAPACITY, dtype='f8')
+        self.ln = np.empty(self.CAPACITY, dtype='i4')
+        self.fl = np.empty(self.CAPACITY, dtype='u1')
+        self.hl = np.empty(self.CAPACITY, dtype='i2')
+        self.dp = np.empty(self.CAPACITY, dtype='u2')
+        self.n = 0
+        self.start_time = None
+        self.bytes = 0
+
+    def append(self, ts, length, flags, header_length, dport):
+        i = self.n % self.CAPACITY
+        self.ts[i] = ts
+        self.ln[i] = length
+        self.fl[i] = flags
+        self.hl[i] = header_length
+        self.dp[i] = dport
+        self.n += 1
+        self.bytes += length
+
+    @property
+    def last_seen(self):
+        """Capture time of the most recent packet."""
+        return self.ts[(self.n - 1) % self.CAPACITY] if self.n else self.start_time
+
+    def window(self):
+        """Return the buffered packets in arrival order."""
+        buffers = (self.ts, self.ln, self.fl, self.hl, self.dp)
+        if self.n <= self.CAPACITY:
+            return tuple(b[:self.n] for b in buffers)
+        i = self.n % self.CAPACITY
+        return tuple(np.concatenate((b[i:], b[:i])) for b in buffers)
 
 
 class HomeNetworkCollector:
     """Collect legitimate home network traffic for model retraining."""
 
-    def __init__(self, duration_hours=24, output_file='data/home_network_baseline.csv'):
+    FLOW_IDLE_TIMEOUT = 300  # Seconds without packets before a flow is dropped
+
+    def __init__(self, duration_hours=24, output_file='data/home_network_baseline.parquet',
+                 raw_socket=False):
         self.duration_hours = duration_hours
         self.output_file = output_file
-        self.flows = defaultdict(lambda: {'packets': [], 'start_time': None, 'bytes': 0})
-        self.collected_flows = []
+        self.raw_socket = raw_socket
+        self.flows = defaultdict(FlowState)
+        self.collected_flows = []  # Pending flow records not yet flushed to disk
+        self.total_flows = 0
+        self.writer = None
+        self.schema = None
         self.start_time = None
         self.end_time = None
 
@@ -53,84 +110,173 @@ class HomeNetworkCollector:
     def process_packet(self, packet):
         """Process a single packet into flows."""
         try:
-            if IP in packet:
-                sport = (
-                    packet[TCP].sport if TCP in packet
-                    else packet[UDP].sport if UDP in packet
-                    else 0
-                )
-                dport = (
-                    packet[TCP].dport if TCP in packet
-                    else packet[UDP].dport if UDP in packet
-                    else 0
-                )
-                key = (packet[IP].src, packet[IP].dst, sport, packet[IP].proto)
+            # Layers are looked up once; the BPF filter already drops non-IP traffic
+            ip = packet.getlayer(IP)
+            if ip is None:
+                return
+            tcp = packet.getlayer(TCP)
+            l4 = tcp if tcp is not None else packet.getlayer(UDP)
+            sport = l4.sport if l4 is not None else 0
+            dport = l4.dport if l4 is not None else 0
+            key = (ip.src, ip.dst, sport, ip.proto)
+
+            # Keep only the scalars the features need, not the packet itself
+            header_length = (ip.ihl or 5) * 4
+            flags = 0
+            if tcp is not None:
+                header_length += (tcp.dataofs or 5) * 4
+                flags = int(tcp.flags)
+            elif l4 is not None:
+                header_length += 8
+
+            self.record_packet(key, float(packet.time), len(packet), flags, header_length, dport)
 
-                flow = self.flows[key]
+        except Exception as e:
+            pass  # Silently ignore errors during collection
 
-                if flow['start_time'] is None:
-                    flow['start_time'] = time.time()
+    def process_frame(self, frame, ts):
+        """Process a raw Ethernet frame without building a Scapy packet."""
+        if len(frame) < ETH_HEADER_LEN + IPV4_HEADER.size:
+            return
 
-                flow['packets'].append(packet)
-                flow['bytes'] += len(packet)
+        ver_ihl, _, frag, proto, src, dst = IPV4_HEADER.unpack_from(frame, ETH_HEADER_LEN)
+        if proto not in (6, 17):
+            return
 
-                # Extract features every 10 packets
-                if len(flow['packets']) % 10 == 0 and len(flow['packets']) >= 10:
-                    self.extract_and_save_flow(key, flow)
+        ip_header = ((ver_ihl & 0x0F) or 5) * 4
+        l4 = ETH_HEADER_LEN + ip_header
+        header_length = ip_header
+        sport = dport = flags = 0
 
-        except Exception as e:
-            pass  # Silently ignore errors during collection
+        # Only the first fragment carries the L4 header
+        if not frag & 0x1FFF and len(frame) >= l4 + L4_PORTS.size:
+            sport, dport = L4_PORTS.unpack_from(frame, l4)
+            if proto == 17:
+                header_length += 8
+            elif len(frame) >= l4 + 14:
+                header_length += ((frame[l4 + 12] >> 4) or 5) * 4
+                flags = frame[l4 + 13]
+
+        key = (socket.inet_ntoa(src), socket.inet_ntoa(dst), sport, proto)
+        self.record_packet(key, ts, len(frame), flags, header_length, dport)
+
+    def record_packet(self, key, ts, length, flags, header_length, dport):
+        """Append one packet's scalars to its flow and extract features every 10 packets."""
+        flow = self.flows[key]
+
+        if flow.start_time is None:
+            flow.start_time = time.time()
+
+        flow.append(ts, length, flags, header_length, dport)
+
+        # Extract features every 10 packets
+        if flow.n % 10 == 0:
+            self.extract_and_save_flow(key, flow)
+
+    def capture_raw(self, on_packet, stop_event):
+        """Capture from a Linux AF_PACKET socket, parsing headers at fixed offsets."""
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_IP))
+        sock.bind((self.interface, 0))
+        sock.settimeout(1.0)
+        buf = bytearray(65536)
+        view = memoryview(buf)
+
+        try:
+            while not stop_event.is_set():
+                try:
+                    n = sock.recv_into(buf)
+                except socket.timeout:
+                    continue
+                self.process_frame(view[:n], time.time())
+                on_packet()
+        finally:
+            sock.close()
 
     def extract_and_save_flow(self, key, flow):
         """Extract features from flow and save."""
         try:
-            if not flow['packets']:
+            if not flow.n:
                 return
 
             # Engineer features
-            features_df = engineer_features_from_flow(flow['packets'])
+            times, sizes, flags, header_lengths, dports = flow.window()
+            features = engineer_features_from_arrays(
+                times, sizes, flags, header_lengths,
+                np.full(len(times), key[2]), dports, key[3],
+                as_frame=False
+            )
 
-            if features_df is not None and not features_df.empty:
+            if features:
                 # Add metadata
-                features_df['src_ip'] = key[0]
-                features_df['dst_ip'] = key[1]
-                features_df['src_port'] = key[2]
-                features_df['protocol'] = key[3]
-                features_df['packet_count'] = len(flow['packets'])
-                features_df['timestamp'] = datetime.now().isoformat()
+                features['src_ip'] = key[0]
+                features['dst_ip'] = key[1]
+                features['src_port'] = key[2]
+                features['protocol'] = key[3]
+                features['packet_count'] = flow.n
+                features['timestamp'] = datetime.now().isoformat()
 
                 # Label as benign (this is the key!)
-                features_df['label'] = 'BenignTraffic'
-                features_df['Label_ID'] = 0  # Assuming 0 is benign
+                features['label'] = 'BenignTraffic'
+                features['Label_ID'] = 0  # Assuming 0 is benign
 
-                self.collected_flows.append(features_df)
+                # Rows are kept as dicts and framed once per checkpoint
+                self.collected_flows.append(features)
 
         except Exception as e:
             pass  # Silently ignore errors
 
+    def open_writer(self, df):
+        """Open the Parquet writer with a float32 schema derived from the first batch."""
+        output_path = Path(self.output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fields = []
+        for field in pa.Schema.from_pandas(df, preserve_index=False):
+            if pa.types.is_floating(field.type):
+                field = field.with_type(pa.float32())
+            fields.append(field)
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(self.output_file, self.schema, compression='zstd')
+
+    def sweep_idle_flows(self):
+        """Drop flows that have not seen a packet within FLOW_IDLE_TIMEOUT."""
+        cutoff = time.time() - self.FLOW_IDLE_TIMEOUT
+        idle = [key for key, flow in self.flows.items() if flow.last_seen < cutoff]
+        for key in idle:
+            del self.flows[key]
+        return len(idle)
+
     def save_checkpoint(self):
-        """Save checkpoint of collected data."""
+        """Append pending flows to the Parquet file."""
         if not self.collected_flows:
             return
 
-        print(f"\n[+] Saving checkpoint... ({len(self.collected_flows)} flows collected)")
+        print(f"\n[+] Saving checkpoint... ({len(self.collected_flows)} new flows)")
 
         try:
-            df = pd.concat(self.collected_flows, ignore_index=True)
+            df = pd.DataFrame.from_records(self.collected_flows)
+            df = df.replace([np.inf, -np.inf], 0.0).fillna(0.0)
 
-            # Create output directory
-            output_path = Path(self.output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.writer is None:
+                self.open_writer(df)
 
-            # Save to CSV
-            df.to_csv(self.output_file, index=False)
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            self.writer.write_table(table)
 
-            print(f"[+] Saved {len(df)} flows to {self.output_file}")
-            print(f"    File size: {os.path.getsize(self.output_file) / 1024**2:.2f} MB")
+            self.total_flows += len(df)
+            self.collected_flows.clear()
+
+            print(f"[+] Saved {len(df)} flows to {self.output_file} ({self.total_flows} total)")
 
         except Exception as e:
             print(f"[!] Error saving checkpoint: {e}")
 
+    def close_writer(self):
+        """Flush the Parquet footer so the file is readable."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
     def start_collection(self):
         """Start collecting network traffic."""
         self.start_time = datetime.now()
@@ -152,16 +298,18 @@ class HomeNetworkCollector:
         print("="*70)
         print()
 
+        sniffer = None
+        stop_timer = None
+
         try:
             # Start packet capture
             checkpoint_interval = 300  # Save checkpoint every 5 minutes
             last_checkpoint = time.time()
             packet_count = 0
 
-            def packet_handler(packet):
+            def on_packet():
                 nonlocal packet_count, last_checkpoint
 
-                self.process_packet(packet)
                 packet_count += 1
 
                 # Print progress every 1000 packets
@@ -169,7 +317,7 @@ class HomeNetworkCollector:
                     elapsed = datetime.now() - self.start_time
                     remaining = self.end_time - datetime.now()
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] Packets: {packet_count:,} | "
-                          f"Flows: {len(self.collected_flows)} | "
+                          f"Flows: {self.total_flows + len(self.collected_flows)} | "
                           f"Elapsed: {str(elapsed).split('.')[0]} | "
                           f"Remaining: {str(remaining).split('.')[0]}")
 
@@ -177,28 +325,56 @@ class HomeNetworkCollector:
                 current_time = time.time()
                 if current_time - last_checkpoint > checkpoint_interval:
                     self.save_checkpoint()
+                    self.sweep_idle_flows()
                     last_checkpoint = current_time
 
-                # Check if duration reached
-                if datetime.now() >= self.end_time:
-                    print("\n[+] Collection duration reached!")
-                    return True  # Stop sniffing
-
-            # Start sniffing
-            sniff(
-                iface=self.interface,
-                prn=packet_handler,
-                store=False,
-                stop_filter=lambda x: datetime.now() >= self.end_time
-            )
+            def packet_handler(packet):
+                self.process_packet(packet)
+                on_packet()
+
+            stop_event = threading.Event()
+
+            def stop_capture():
+                print("\n[+] Collection duration reached!")
+                stop_event.set()
+                if sniffer is not None and sniffer.running:
+                    sniffer.stop()
+
+            # A timer ends the capture instead of a per-packet stop_filter
+            stop_timer = threading.Timer(self.duration_hours * 3600, stop_capture)
+            stop_timer.daemon = True
+
+            if self.raw_socket:
+                stop_timer.start()
+                self.capture_raw(on_packet, stop_event)
+            else:
+                # BPF keeps non-TCP/UDP traffic in the kernel
+                sniffer = AsyncSniffer(
+                    iface=self.interface,
+                    filter="ip and (tcp or udp)",
+                    prn=packet_handler,
+                    store=False
+                )
+                sniffer.start()
+                stop_timer.start()
+
+                # Join with a timeout so Ctrl+C is still delivered on Windows
+                while sniffer.running:
+                    sniffer.join(timeout=1)
 
         except KeyboardInterrupt:
             print("\n\n[!] Collection stopped by user")
+            if sniffer is not None and sniffer.running:
+                sniffer.stop()
 
         finally:
+            if stop_timer is not None:
+                stop_timer.cancel()
+
             # Save final checkpoint
             print("\n[+] Saving final data...")
             self.save_checkpoint()
+            self.close_writer()
 
             # Print summary
             print("\n" + "="*70)
@@ -207,7 +383,7 @@ class HomeNetworkCollector:
             print(f"Started:  {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Ended:    {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Duration: {datetime.now() - self.start_time}")
-            print(f"Flows collected: {len(self.collected_flows)}")
+            print(f"Flows collected: {self.total_flows}")
             print(f"Output file: {self.output_file}")
 
             if os.path.exists(self.output_file):
@@ -235,8 +411,13 @@ def main():
     parser.add_argument(
         '--output',
         type=str,
-        default='data/home_network_baseline.csv',
-        help='Output CSV file (default: data/home_network_baseline.csv)'
+        default='data/home_network_baseline.parquet',
+        help='Output Parquet file (default: data/home_network_baseline.parquet)'
+    )
+    parser.add_argument(
+        '--raw-socket',
+        action='store_true',
+        help='Linux only: capture from an AF_PACKET socket without Scapy dissection'
     )
 
     args = parser.parse_args()
@@ -266,10 +447,15 @@ def main():
             print(f"Please run: sudo python {__file__} --duration {args.duration}")
         return 1
 
+    if args.raw_socket and not hasattr(socket, 'AF_PACKET'):
+        print("[!] ERROR: --raw-socket requires Linux (AF_PACKET sockets)")
+        return 1
+
     # Start collection
     collector = HomeNetworkCollector(
         duration_hours=args.duration,
-        output_file=args.output
+        output_file=args.output,
+        raw_socket=args.raw_socket
     )
 
     collector.start_collection()
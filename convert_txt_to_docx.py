@@ -1,6 +1,15 @@
 from docx import Document
 import os
 
+# Paragraph prefixes, checked with str.startswith(tuple)
+HEADING_PREFIXES = (
+    'CHAPTER', 'FIGURE', 'TABLE',
+    'LIST OF', 'ABSTRACT', 'DECLARATION', 'APPROVAL', 'ACKNOWLEDGEMENTS',
+    'DEDICATION', 'REFERENCES', 'APPENDICES',
+)
+CAPTION_PREFIXES = ('Figure ', 'Table ')
+BULLET_PREFIXES = ('- ', '• ')
+
 def convert_txt_to_docx(txt_file_path, docx_file_path):
     # Read the text file
     with open(txt_file_path, 'r', encoding='utf-8') as txt_file:
@@ -13,21 +22,21 @@ def convert_txt_to_docx(txt_file_path, docx_file_path):
     paragraphs = text_content.split('\n\n')
 
     for paragraph in paragraphs:
+        text = paragraph.strip()
+
         # Handle different types of content
-        if paragraph.strip().startswith('CHAPTER') or paragraph.strip().startswith('FIGURE') or paragraph.strip().startswith('TABLE'):
+        if text.startswith(HEADING_PREFIXES):
             # Add as heading
-            doc.add_heading(paragraph.strip(), level=1)
-        elif paragraph.strip().startswith('LIST OF') or paragraph.strip().startswith('ABSTRACT') or paragraph.strip().startswith('DECLARATION') or paragraph.strip().startswith('APPROVAL') or paragraph.strip().startswith('ACKNOWLEDGEMENTS') or paragraph.strip().startswith('DEDICATION') or paragraph.strip().startswith('REFERENCES') or paragraph.strip().startswith('APPENDICES'):
-            doc.add_heading(paragraph.strip(), level=1)
-        elif paragraph.strip().startswith('Figure ') or paragraph.strip().startswith('Table '):
+            doc.add_heading(text, level=1)
+        elif text.startswith(CAPTION_PREFIXES):
             # Add as caption
-            doc.add_paragraph(paragraph.strip(), style='Caption')
-        elif paragraph.strip().startswith('- ') or paragraph.strip().startswith('• '):
+            doc.add_paragraph(text, style='Caption')
+        elif text.startswith(BULLET_PREFIXES):
             # Bullet points
-            doc.add_paragraph(paragraph.strip(), style='List Bullet')
+            doc.add_paragraph(text, style='List Bullet')
         elif '|' in paragraph and len(paragraph.split('|')) > 3:
             # Table-like content
-            lines = paragraph.strip().split('\n')
+            lines = text.split('\n')
             if len(lines) > 1:
                 # Create table
                 num_cols = len(lines[0].split('|')) - 1  # Subtract 1 for empty first/last
@@ -40,12 +49,12 @@ def convert_txt_to_docx(txt_file_path, docx_file_path):
                             if j < num_cols:
                                 table.cell(i, j).text = cell.strip()
                 else:
-                    doc.add_paragraph(paragraph.strip())
+                    doc.add_paragraph(text)
             else:
-                doc.add_paragraph(paragraph.strip())
+                doc.add_paragraph(text)
         else:
             # Regular paragraph
-            doc.add_paragraph(paragraph.strip())
+            doc.add_paragraph(text)
 
     # Save the document
     doc.save(docx_file_path)
@@ -2,99 +2,157 @@
 
 Produces a simple CSV-like summary printed to stdout and a small aggregate report of
 false positives (benign predicted as attack) and detection rate (attacks predicted as attack).
+Flows are generated directly as per-packet NumPy arrays (no Scapy packets), featurized
+first and then classified with a single batched prediction.
 """
+import csv
+import sys
 import time
-import json
-from collections import Counter
-from scapy.all import Ether, IP, TCP, UDP
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
-from src.data_processing.feature_engineer import engineer_features_from_flow
-from src.models.predict import diagnose_prediction, predict_threat
+import numpy as np
+import pandas as pd
+
+from src.data_processing.feature_engineer import engineer_features_from_arrays
+
+
+# Frame layout of the synthetic packets (Ether/IPv4 with no options and no payload)
+ETHER_LEN = 14
+IPV4_HEADER_LEN = 20
+TCP_HEADER_LEN = 20
+UDP_HEADER_LEN = 8
+TCP_SYN = 0x02
+TCP_ACK = 0x10
+
+
+def _flow_arrays(times, flags, sports, dports, protocol, bwd_mask):
+    """Per-packet arrays in the layout engineer_features_from_arrays expects."""
+    count = len(times)
+    header_len = IPV4_HEADER_LEN + (TCP_HEADER_LEN if protocol == 6 else UDP_HEADER_LEN)
+    return {
+        'times': times,
+        'sizes': np.full(count, ETHER_LEN + header_len, dtype=np.int32),
+        'tcp_flags': np.full(count, flags, dtype=np.uint8),
+        'header_lengths': np.full(count, header_len, dtype=np.int32),
+        'sports': sports,
+        'dports': dports,
+        'protocol': protocol,
+        'bwd_mask': bwd_mask,
+    }
 
 
 def build_benign_flow(count=20):
-    pkts = []
-    base_time = time.time()
-    for i in range(count):
-        if i % 2 == 0:
-            pkt = Ether()/IP(src="192.168.1.10", dst="192.168.1.100")/TCP(sport=12345, dport=80, flags='A')
-        else:
-            pkt = Ether()/IP(src="192.168.1.100", dst="192.168.1.10")/TCP(sport=80, dport=12345, flags='A')
-        pkt.time = base_time + (i * 0.05)
-        pkts.append(pkt)
-    return pkts
+    """HTTP-like ACK exchange alternating between client and server."""
+    i = np.arange(count)
+    from_server = i % 2 == 1
+    return _flow_arrays(
+        times=time.time() + i * 0.05,
+        flags=TCP_ACK,
+        sports=np.where(from_server, 80, 12345),
+        dports=np.where(from_server, 12345, 80),
+        protocol=6,
+        bwd_mask=from_server,
+    )
 
 
 def build_syn_flood(count=40):
-    pkts = []
-    base_time = time.time()
-    for i in range(count):
-        pkt = Ether()/IP(src=f"10.0.0.{i%50}", dst="192.168.1.100")/TCP(sport=1024+i, dport=80, flags='S')
-        pkt.time = base_time + (i * 0.001)
-        pkts.append(pkt)
-    return pkts
+    """SYNs to port 80 from 50 rotating sources (10.0.0.0-49)."""
+    i = np.arange(count)
+    return _flow_arrays(
+        times=time.time() + i * 0.001,
+        flags=TCP_SYN,
+        sports=1024 + i,
+        dports=np.full(count, 80),
+        protocol=6,
+        bwd_mask=i % 50 != 0,  # sources other than the first count as backward
+    )
 
 
 def build_udp_flood(count=40):
-    pkts = []
-    base_time = time.time()
-    for i in range(count):
-        pkt = Ether()/IP(src=f"10.0.1.{i%50}", dst="192.168.1.100")/UDP(sport=5000+i, dport=53)
-        pkt.time = base_time + (i * 0.001)
-        pkts.append(pkt)
-    return pkts
+    """UDP datagrams to port 53 from 50 rotating sources (10.0.1.0-49)."""
+    i = np.arange(count)
+    return _flow_arrays(
+        times=time.time() + i * 0.001,
+        flags=0,
+        sports=5000 + i,
+        dports=np.full(count, 53),
+        protocol=17,
+        bwd_mask=i % 50 != 0,
+    )
 
 
-def run_batch(benign_n=10, syn_n=5, udp_n=5):
-    rows = []
+# One CSV row's prediction columns, unpacked once per prediction
+Pred = namedtuple('Pred', 'attack severity confidence method weighted')
+
+
+def to_pred(prediction):
+    """Pull the reported columns out of a predict_threat-style dict."""
+    return Pred(
+        prediction.get('attack'),
+        prediction.get('severity'),
+        f"{prediction.get('confidence'):.4f}",
+        prediction.get('method'),
+        prediction.get('weighted_confidence'),
+    )
+
+
+# Flow kind -> (builder, packets per flow)
+FLOW_BUILDERS = {
+    'benign': (build_benign_flow, 20),
+    'syn': (build_syn_flood, 50),
+    'udp': (build_udp_flood, 50),
+}
+
+
+def featurize_flow(kind):
+    """Build and featurize one flow of the given kind; may run in a worker process."""
+    builder, count = FLOW_BUILDERS[kind]
+    return engineer_features_from_arrays(**builder(count))
+
+
+def run_batch(benign_n=10, syn_n=5, udp_n=5, use_ensemble=True, workers=1):
+    # Imported here so worker processes don't load TensorFlow
+    from src.models.predict import predict_threat_batch
+
     summary = {'benign_total': 0, 'benign_fp': 0, 'syn_total': 0, 'syn_detected': 0, 'udp_total': 0, 'udp_detected': 0}
+    counts = {'benign': benign_n, 'syn': syn_n, 'udp': udp_n}
+
+    # Phase 1: builders are deterministic apart from the base timestamp, which
+    # no feature depends on, so each kind is featurized once and reused
+    kinds = [kind for kind, n in counts.items() if n > 0]
+    if workers > 1 and len(kinds) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(kinds))) as ex:
+            feats = list(ex.map(featurize_flow, kinds))
+    else:
+        feats = [featurize_flow(kind) for kind in kinds]
+
+    # Phase 2: one batched prediction, one row per kind; identical inputs give
+    # identical predictions, so each result stands for all flows of that kind
+    preds = {}
+    if feats:
+        batch = pd.concat(feats, ignore_index=True)
+        results = predict_threat_batch(batch, use_ensemble=use_ensemble)
+        if not use_ensemble:
+            # weighted_conf still reports the ensemble's weighted confidence,
+            # for comparison with the RF-only decision
+            ensemble = predict_threat_batch(batch)
+            results = [{**result, 'weighted_confidence': e.get('weighted_confidence')}
+                       for result, e in zip(results, ensemble)]
+        preds = dict(zip(kinds, map(to_pred, results)))
+
+    rows = []
+    for kind in kinds:
+        pred = preds[kind]
+        rows.extend((f'{kind}_{i}', kind, *pred) for i in range(counts[kind]))
+
+        summary[f'{kind}_total'] += counts[kind]
+        if pred.attack and pred.attack != 'BenignTraffic':
+            summary['benign_fp' if kind == 'benign' else f'{kind}_detected'] += counts[kind]
 
-    print('id,type,attack,severity,confidence,method,weighted_conf')
-
-    # Benign flows
-    for i in range(benign_n):
-        pkts = build_benign_flow(20)
-        feats = engineer_features_from_flow(pkts)
-        diag = diagnose_prediction(feats)
-        pred = predict_threat(feats)
-        attack = pred.get('attack')
-        conf = pred.get('confidence')
-        method = pred.get('method')
-        weighted = diag.get('weighted_confidence')
-        print(f"benign_{i},benign,{attack},{pred.get('severity')},{conf:.4f},{method},{weighted}")
-        summary['benign_total'] += 1
-        if attack and attack != 'BenignTraffic':
-            summary['benign_fp'] += 1
-
-    # SYN floods
-    for i in range(syn_n):
-        pkts = build_syn_flood(50)
-        feats = engineer_features_from_flow(pkts)
-        diag = diagnose_prediction(feats)
-        pred = predict_threat(feats)
-        attack = pred.get('attack')
-        conf = pred.get('confidence')
-        method = pred.get('method')
-        weighted = diag.get('weighted_confidence')
-        print(f"syn_{i},syn,{attack},{pred.get('severity')},{conf:.4f},{method},{weighted}")
-        summary['syn_total'] += 1
-        if attack and attack != 'BenignTraffic':
-            summary['syn_detected'] += 1
-
-    # UDP floods
-    for i in range(udp_n):
-        pkts = build_udp_flood(50)
-        feats = engineer_features_from_flow(pkts)
-        diag = diagnose_prediction(feats)
-        pred = predict_threat(feats)
-        attack = pred.get('attack')
-        conf = pred.get('confidence')
-        method = pred.get('method')
-        weighted = diag.get('weighted_confidence')
-        print(f"udp_{i},udp,{attack},{pred.get('severity')},{conf:.4f},{method},{weighted}")
-        summary['udp_total'] += 1
-        if attack and attack != 'BenignTraffic':
-            summary['udp_detected'] += 1
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(('id', 'type', 'attack', 'severity', 'confidence', 'method', 'weighted_conf'))
+    writer.writerows(rows)
 
     # Print summary
     print('\nSUMMARY:')
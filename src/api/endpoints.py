@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
 from src.network.traffic_analyzer import (
@@ -8,10 +9,17 @@ from src.network.traffic_analyzer import (
 )
 from src.network.packet_sniffer import get_network_interfaces, get_active_interface
 from src.iot_security.device_detector import iot_detector
+from src.api.responses import FastJSONResponse, stream_json_array
+from src.utils.helpers import ttl_cache
 import src.network.traffic_analyzer as traffic_analyzer
 
 router = APIRouter()
 
+# Interface probing is slow relative to a request; dashboards poll these endpoints
+INTERFACE_CACHE_TTL = 10  # seconds
+cached_network_interfaces = ttl_cache(INTERFACE_CACHE_TTL)(get_network_interfaces)
+cached_active_interface = ttl_cache(INTERFACE_CACHE_TTL)(get_active_interface)
+
 # Request models
 class AcknowledgeAlertRequest(BaseModel):
     alert_id: int
@@ -103,7 +111,7 @@ def clear_alerts():
         # Clear the alerts list
         alerts.clear()
         # Clear alert manager
-        alert_manager.alerts.clear()
+        alert_manager.clear()
         return {"message": "All alerts cleared", "success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear alerts: {str(e)}")
@@ -135,7 +143,13 @@ def get_alerts_by_status():
 @router.get("/flows")
 def get_flows():
     """Get current network flows."""
-    return [{"key": k, "pkt_count": len(v['packets'])} for k, v in flows.items()]
+    # Snapshot the items (the sniffer thread keeps inserting) and stream the
+    # array in chunks instead of materializing every flow dict first
+    items = list(flows.items())
+    return StreamingResponse(
+        stream_json_array({"key": k, "pkt_count": v['pkt_count']} for k, v in items),
+        media_type="application/json"
+    )
 
 
 # Response action endpoints
@@ -185,8 +199,8 @@ def get_action_history(limit: int = Query(100, description="Number of actions to
 def get_interfaces():
     """Get information about all network interfaces."""
     try:
-        interfaces = get_network_interfaces()
-        active_interface = get_active_interface()
+        interfaces = cached_network_interfaces()
+        active_interface = cached_active_interface()
         return {
             "interfaces": interfaces,
             "active_interface": active_interface,
@@ -199,8 +213,8 @@ def get_interfaces():
 def get_network_status():
     """Get current network monitoring status."""
     try:
-        interfaces = get_network_interfaces()
-        active_interface = get_active_interface()
+        interfaces = cached_network_interfaces()
+        active_interface = cached_active_interface()
 
         # Filter out loopback to show only external interfaces
         external_interfaces = [iface for iface in interfaces if not iface['is_loopback']]
@@ -222,24 +236,12 @@ def get_network_status():
 def get_iot_devices():
     """Get all detected devices (IoT and non-IoT)."""
     try:
-        all_devices = iot_detector.get_all_devices()
-
-        # Convert sets to lists for JSON serialization
-        for device in all_devices:
-            if 'ports_used' in device:
-                device['ports_used'] = list(device['ports_used'])
-            if 'protocols_seen' in device:
-                device['protocols_seen'] = list(device['protocols_seen'])
-            # Convert datetime to string
-            if 'first_seen' in device:
-                device['first_seen'] = device['first_seen'].isoformat()
-            if 'last_seen' in device:
-                device['last_seen'] = device['last_seen'].isoformat()
+        all_devices = iot_detector.get_all_devices_json()
 
-        return {
+        return FastJSONResponse({
             "devices": all_devices,
             "total": len(all_devices)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get devices: {str(e)}")
 
@@ -256,23 +258,12 @@ def get_iot_summary():
 def get_device_details(ip_address: str):
     """Get details of a specific device by IP address."""
     try:
-        device = iot_detector.get_device_info(ip_address=ip_address)
+        device = iot_detector.get_device_json(ip_address=ip_address)
 
         if not device:
             raise HTTPException(status_code=404, detail="Device not found")
 
-        # Convert sets to lists for JSON serialization
-        if 'ports_used' in device:
-            device['ports_used'] = list(device['ports_used'])
-        if 'protocols_seen' in device:
-            device['protocols_seen'] = list(device['protocols_seen'])
-        # Convert datetime to string
-        if 'first_seen' in device:
-            device['first_seen'] = device['first_seen'].isoformat()
-        if 'last_seen' in device:
-            device['last_seen'] = device['last_seen'].isoformat()
-
-        return device
+        return FastJSONResponse(device)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,25 +1,26 @@
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse
 import asyncio
 import logging
-import yaml
+from contextlib import asynccontextmanager
 from pathlib import Path
 from src.api.endpoints import router
-from src.network.traffic_analyzer import alerts, start_analyzer, alert_manager
+from src.api.responses import FastJSONResponse, dumps
+from src.network.traffic_analyzer import alerts, start_analyzer, stop_analyzer, alert_manager
 from src.network.packet_sniffer import get_active_interface, get_network_interfaces
 from src.utils.helpers import setup_logging
+from src.utils.config_loader import load_config as _load_yaml_config
 
 # Setup logging
 logger = setup_logging()
 
 # Load configuration
 def load_config(config_path='config.yaml'):
-    """Load configuration from YAML file."""
+    """Load configuration from YAML file (cached until the file changes; read-only)."""
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return _load_yaml_config(config_path)
     except Exception as e:
         logger.error(f"Failed to load config: {e}")
         return {}
@@ -30,15 +31,7 @@ config_path = os.environ.get('CONFIG_PATH', 'config.yaml')
 logger.info(f"Loading configuration from: {config_path}")
 config = load_config(config_path)
 
-app = FastAPI(
-    title="IDS & IoT Security System",
-    description="Real-time threat detection and monitoring system",
-    version="1.0.0"
-)
-
-# Display network interface information on startup
-@app.on_event("startup")
-async def startup_event():
+def log_network_interfaces():
     """Display network interface information when the server starts."""
     try:
         interfaces = get_network_interfaces()
@@ -64,6 +57,46 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to display network interface info: {e}")
 
+async def warm_up_models():
+    """Load the models and run a dummy prediction before serving requests."""
+    try:
+        from src.models.predict import warm_up_models as _warm_up
+        await asyncio.to_thread(_warm_up)
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the analyzer and background tasks with the server, stop them on shutdown."""
+    log_network_interfaces()
+
+    # Start traffic analyzer with configuration
+    interface = config.get('network', {}).get('interface', None) or get_active_interface()
+    await asyncio.to_thread(start_analyzer, interface=interface, config=config)
+    await warm_up_models()
+
+    # Hand new alerts from the analyzer thread to the event loop for batching
+    loop = asyncio.get_running_loop()
+    listener = lambda alert: loop.call_soon_threadsafe(alert_batcher.add, alert)
+    alert_manager.add_listener(listener)
+    flow_push_task = asyncio.create_task(push_flow_diffs())
+
+    yield
+
+    alert_manager.remove_listener(listener)
+    alert_batcher.flush()
+    flow_push_task.cancel()
+    stop_analyzer()
+
+# Run with `uvicorn[standard]` (uvloop + httptools) for the faster event loop and HTTP parser
+app = FastAPI(
+    title="IDS & IoT Security System",
+    description="Real-time threat detection and monitoring system",
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
+)
+
 # Add CORS middleware to allow frontend to access API
 app.add_middleware(
     CORSMiddleware,
@@ -75,72 +108,156 @@ app.add_middleware(
 
 app.include_router(router, prefix="/api")
 
-# Start traffic analyzer with configuration
-interface = config.get('network', {}).get('interface', None) or get_active_interface()
-start_analyzer(interface=interface, config=config)
-
-# Serve static files for the React app
-@app.get("/{path:path}")
-async def serve_spa(path: str):
-    if path.startswith("api/") or path in ["ws/alerts", "ws/flows"]:
-        raise HTTPException(status_code=404, detail="Not found")
-    file_path = Path("src/frontend/dist") / path
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
-    # For SPA, serve index.html for any non-API path
-    index_path = Path("src/frontend/dist/index.html")
-    if index_path.exists():
-        return FileResponse(index_path, media_type="text/html")
-    raise HTTPException(status_code=404, detail="Not found")
+def encode_message(message):
+    """Serialize a WebSocket message to JSON text once for all recipients."""
+    return dumps(message).decode()
 
 # WebSocket manager
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections = []
+    """
+    Fans published messages out to subscribers through bounded per-client queues.
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    A client that falls max_queue messages behind loses its oldest message, or,
+    if a snapshot callable is given, its whole backlog in favour of a fresh
+    snapshot message.
+    """
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    def __init__(self, max_queue=100, snapshot=None):
+        self.max_queue = max_queue
+        self.snapshot = snapshot
+        self.subscribers = set()
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections[:]:
-            try:
-                await connection.send_json(message)
-            except:
-                self.disconnect(connection)
+    def publish(self, message):
+        """Queue a message for every subscriber. Must run on the event loop."""
+        payload = encode_message(message)
+        for queue in self.subscribers:
+            if queue.full():
+                if self.snapshot is None:
+                    queue.get_nowait()
+                else:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(encode_message(self.snapshot()))
+                    continue
+            queue.put_nowait(payload)
+
+    async def subscribe(self):
+        """Yield encoded messages published after subscribing (snapshot first, if any)."""
+        queue = asyncio.Queue(self.max_queue)
+        if self.snapshot is not None:
+            queue.put_nowait(encode_message(self.snapshot()))
+        self.subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers.discard(queue)
+
+async def stream_to(websocket: WebSocket, connection_manager: ConnectionManager):
+    """Send a manager's messages to a client until it disconnects."""
+    await websocket.accept()
+
+    async def send():
+        async for payload in connection_manager.subscribe():
+            await websocket.send_text(payload)
+
+    async def watch():
+        # Clients send nothing; reading notices a disconnect without waiting
+        # for the next publish to fail
+        while (await websocket.receive())['type'] != 'websocket.disconnect':
+            pass
+
+    tasks = {asyncio.create_task(send()), asyncio.create_task(watch())}
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    # Cancelling the sender ends its subscription
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        e = task.exception()
+        if e is not None and not isinstance(e, WebSocketDisconnect):
+            logger.error(f"WebSocket stream failed: {e!r}", exc_info=e)
+
+class MessageBatcher:
+    """
+    Publishes messages as lists, one per window seconds or max_batch messages,
+    whichever comes first. Must be used from the event loop.
+    """
+
+    def __init__(self, connection_manager, window=0.05, max_batch=32):
+        self.connection_manager = connection_manager
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self._timer = None
+
+    def add(self, message):
+        self.pending.append(message)
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.connection_manager.publish(batch)
 
 manager = ConnectionManager()
-flows_manager = ConnectionManager()
+alert_batcher = MessageBatcher(manager)
 
 @app.websocket('/ws/alerts')
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
-    last_alert_count = 0
-    try:
-        while True:
-            await asyncio.sleep(1)  # Check for new alerts every second
-            # Get alerts from alert_manager (the source of truth)
-            current_alerts = alert_manager.get_alerts(limit=1)
-            current_count = alert_manager.alert_counter
-
-            # If there's a new alert, broadcast it
-            if current_count > last_alert_count and current_alerts:
-                await manager.broadcast(current_alerts[0])  # Send the latest alert
-                last_alert_count = current_count
-    except:
-        manager.disconnect(websocket)
+    await stream_to(websocket, manager)
+
+def diff_flow_counts(current, last_sent):
+    """Describe how flow packet counts changed since the last message."""
+    added, updated = [], []
+    for key, count in current.items():
+        previous = last_sent.get(key)
+        if previous is None:
+            added.append({"key": key, "pkt_count": count})
+        elif previous != count:
+            updated.append({"key": key, "pkt_count": count})
+    removed = [key for key in last_sent if key not in current]
+    return {"added": added, "updated": updated, "removed": removed}
+
+# Flow packet counts as of the last published diff
+flow_counts = {}
+
+def flow_snapshot():
+    """Full flow state as a diff that replaces whatever the client holds."""
+    return {"reset": True, **diff_flow_counts(flow_counts, {})}
+
+flows_manager = ConnectionManager(snapshot=flow_snapshot)
+
+async def push_flow_diffs(interval=1.0):
+    """Publish one flow diff per interval, shared by every /ws/flows client."""
+    global flow_counts
+    from src.network import traffic_analyzer
+    flows = traffic_analyzer.flows
+    version = None
+    while True:
+        await asyncio.sleep(interval)
+        if not flows_manager.subscribers or traffic_analyzer.flows_version == version:
+            continue
+        version = traffic_analyzer.flows_version
+        current = {k: v['pkt_count'] for k, v in list(flows.items())}
+        diff = diff_flow_counts(current, flow_counts)
+        flow_counts = current
+        if diff["added"] or diff["updated"] or diff["removed"]:
+            flows_manager.publish(diff)
 
 @app.websocket('/ws/flows')
 async def websocket_flows_endpoint(websocket: WebSocket):
-    await flows_manager.connect(websocket)
-    try:
-        while True:
-            await asyncio.sleep(1)  # send flows every 1s
-            from src.network.traffic_analyzer import flows
-            flow_data = [{"key": k, "pkt_count": len(v['packets'])} for k, v in flows.items()]
-            await websocket.send_json(flow_data)
-    except:
-        flows_manager.disconnect(websocket)
+    await stream_to(websocket, flows_manager)
+
+# Serve the built React app; mounted last so API and WebSocket routes match first
+FRONTEND_DIST = Path("src/frontend/dist")
+if FRONTEND_DIST.is_dir():
+    app.mount("/", StaticFiles(directory=FRONTEND_DIST, html=True), name="spa")
+else:
+    logger.warning(f"Frontend build not found at {FRONTEND_DIST}; dashboard will not be served")
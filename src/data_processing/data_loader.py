@@ -1,14 +1,215 @@
+import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-def load_data(file_path):
+from src.data_processing.feature_engineer import REQUIRED_FEATURES
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pa_fs
+    import pyarrow.parquet as pq
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+INT_TARGETS = ('int8', 'int16', 'int32')
+UINT_TARGETS = ('uint8', 'uint16', 'uint32')
+
+# CIC-IoT-2023 column layout: the model features plus the class label.
+# Headers that don't match fall back to type inference.
+LABEL_COLUMN = 'label'
+CICIDS_COLUMNS = [*REQUIRED_FEATURES, LABEL_COLUMN]
+_CICIDS_DTYPES = {**{name: 'float32' for name in REQUIRED_FEATURES}, LABEL_COLUMN: 'category'}
+
+def _scan_ranges_numpy(a):
+    """
+    Per-column (min, max) of a 2D float64 array, ignoring NaN.
+    """
+    return np.fmin.reduce(a, axis=0), np.fmax.reduce(a, axis=0)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _scan_ranges(a):
+        n_rows, n_cols = a.shape
+        mins = np.empty(n_cols)
+        maxs = np.empty(n_cols)
+        for j in prange(n_cols):
+            lo = np.inf
+            hi = -np.inf
+            for i in range(n_rows):
+                v = a[i, j]
+                if v < lo:
+                    lo = v
+                if v > hi:
+                    hi = v
+            mins[j] = lo
+            maxs[j] = hi
+        return mins, maxs
+else:
+    _scan_ranges = _scan_ranges_numpy
+
+def optimize_dtypes(df):
+    """
+    Downcast numeric columns to the smallest dtype that holds their values.
+    """
+    num_cols = df.select_dtypes(include=['integer', 'floating']).columns
+    if df.empty or not len(num_cols):
+        return df
+
+    # One pass over the numeric block for every column's range
+    mins, maxs = _scan_ranges(df[num_cols].to_numpy(dtype=np.float64))
+
+    is_int = np.array([pd.api.types.is_integer_dtype(df[c].dtype) for c in num_cols])
+    is_uint = np.array([pd.api.types.is_unsigned_integer_dtype(df[c].dtype) for c in num_cols])
+    int_fits = [(mins >= np.iinfo(t).min) & (maxs <= np.iinfo(t).max) for t in INT_TARGETS]
+    uint_fits = [maxs <= np.iinfo(t).max for t in UINT_TARGETS]
+    f32 = np.finfo(np.float32)
+    float_fits = ~((mins < f32.min) | (maxs > f32.max))  # all-NaN columns fit too
+
+    targets = np.where(
+        is_uint,
+        np.select(uint_fits, UINT_TARGETS, default='uint64'),
+        np.where(
+            is_int,
+            np.select(int_fits, INT_TARGETS, default='int64'),
+            np.where(float_fits, 'float32', 'float64'),
+        ),
+    )
+
+    # Only ever shrink a column (e.g. float16 isn't widened to float32)
+    changed = {c: t for c, t in zip(num_cols, targets)
+               if np.dtype(t).itemsize < df[c].dtype.itemsize}
+    return df.astype(changed) if changed else df
+
+PARQUET_COMPRESSION = 'zstd'
+
+def _read_csv(file_path, columns=None):
+    """
+    Read a CSV with the known CIC-IDS dtypes and the pyarrow parser,
+    falling back to plain inference when the file doesn't fit them.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtype = {c: t for c, t in _CICIDS_DTYPES.items() if c in header}
+    try:
+        return pd.read_csv(file_path, usecols=columns, dtype=dtype, engine='pyarrow')
+    except (ValueError, ImportError):
+        return pd.read_csv(file_path, usecols=columns, memory_map=True)
+
+def _arrow_csv_types(csv_path):
+    """
+    Arrow column types for the known CIC-IDS columns in a CSV.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    types = {
+        name: pa.dictionary(pa.int32(), pa.string()) if dtype == 'category' else pa.float32()
+        for name, dtype in _CICIDS_DTYPES.items()
+    }
+    return {c: t for c, t in types.items() if c in header}
+
+def _parquet_cache(csv_path):
     """
-    Load data from CSV or JSON file.
+    Path of the Parquet copy of a CSV, written next to it on first read.
+    Returns None if pyarrow is missing or the copy can't be written.
+    """
+    if pa is None:
+        return None
+    cache_path = csv_path.with_suffix('.parquet')
+    if cache_path.exists() and cache_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return cache_path
+    try:
+        try:
+            convert_options = pa_csv.ConvertOptions(column_types=_arrow_csv_types(csv_path))
+            table = pa_csv.read_csv(csv_path, convert_options=convert_options)
+        except pa.ArrowInvalid:
+            table = pa_csv.read_csv(csv_path)
+        pq.write_table(table, cache_path, compression=PARQUET_COMPRESSION)
+    except (OSError, pa.ArrowException):
+        return None
+    return cache_path
+
+def load_data(file_path, downcast=False, columns=None):
+    """
+    Load data from Parquet, HDF5, CSV or JSON file.
+    CSVs are converted to a sibling .parquet file on first read and loaded
+    from it afterwards, as long as it is newer than the CSV.
+    Set downcast=True to shrink numeric columns with optimize_dtypes().
     """
     file_path = Path(file_path)
     if file_path.suffix == '.csv':
-        return pd.read_csv(file_path)
+        cache_path = _parquet_cache(file_path)
+        if cache_path is not None:
+            df = pd.read_parquet(cache_path, engine='pyarrow', columns=columns, memory_map=True)
+        else:
+            df = _read_csv(file_path, columns=columns)
+    elif file_path.suffix == '.parquet':
+        df = pd.read_parquet(file_path, engine='pyarrow', columns=columns, memory_map=True)
+    elif file_path.suffix in ('.h5', '.hdf5'):
+        df = pd.read_hdf(file_path, columns=columns)
     elif file_path.suffix == '.json':
-        return pd.read_json(file_path)
+        df = pd.read_json(file_path)
+        if columns is not None:
+            df = df[list(columns)]
+    else:
+        raise ValueError("Unsupported file format. Use Parquet, HDF5, CSV or JSON.")
+    return optimize_dtypes(df) if downcast else df
+
+def load_cicids_data(data_dir, columns=None, downcast=False):
+    """
+    Load and concatenate every CSV in a CIC-IDS style dataset directory.
+    Each CSV is read through its Parquet cache (see load_data); Parquet
+    files with no CSV next to them are loaded too.
+    Pass columns to read only the features needed downstream, e.g.
+    CICIDS_COLUMNS for the model features and label.
+    """
+    # One scandir pass; its entries carry the file type, so no per-file stat
+    with os.scandir(data_dir) as entries:
+        paths = sorted(Path(e.path) for e in entries if e.is_file() and e.name.endswith(('.csv', '.parquet')))
+    files = [f for f in paths if f.suffix == '.csv']
+    csv_stems = {f.stem for f in files}
+    files += [f for f in paths if f.suffix == '.parquet' and f.stem not in csv_stems]
+    if not files:
+        raise FileNotFoundError(f"No CSV or Parquet files found in {data_dir}")
+
+    parquet_files = [f if f.suffix == '.parquet' else _parquet_cache(f) for f in files]
+    if pa is not None and None not in parquet_files:
+        # Per-file schemas can disagree (e.g. int vs float for the same
+        # column), so scan against their permissive union
+        schema = pa.unify_schemas(
+            [pq.read_schema(f) for f in parquet_files], promote_options='permissive'
+        )
+        dataset = ds.dataset(
+            parquet_files, schema=schema, format='parquet',
+            filesystem=pa_fs.LocalFileSystem(use_mmap=True)
+        )
+        df = dataset.to_table(columns=list(columns) if columns is not None else None).to_pandas()
+    elif pl is not None:
+        # Lazy multi-file scan, collected in streaming batches so the
+        # per-file frames are never all held alongside the result
+        lf = pl.concat(
+            [pl.scan_parquet(f) if f.suffix == '.parquet' else pl.scan_csv(f, low_memory=True) for f in files],
+            how='vertical_relaxed'
+        )
+        if columns is not None:
+            lf = lf.select(list(columns))
+        try:
+            df = lf.collect(engine='streaming').to_pandas()
+        except TypeError:
+            df = lf.collect(streaming=True).to_pandas()
     else:
-        raise ValueError("Unsupported file format. Use CSV or JSON.")
+        df = pd.concat(
+            (load_data(f, columns=columns) for f in files),
+            ignore_index=True
+        )
+    return optimize_dtypes(df) if downcast else df
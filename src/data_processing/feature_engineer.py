@@ -11,20 +11,43 @@ CICIoT2023 Features:
 - Advanced metrics (Magnitude, Radius, Covariance, Weight)
 """
 
+import socket
+import struct
 import numpy as np
 import pandas as pd
-from scapy.all import TCP, UDP, IP, ICMP, ARP
+from scapy.all import Ether, TCP, UDP, IP, ICMP, ARP
 from typing import List, Dict, Optional
 import json
+from functools import lru_cache
 from pathlib import Path
 
+FEATURE_INFO_PATH = Path('trained_models/retrained/feature_info.json')
+
+
+@lru_cache(maxsize=16)
+def _load_feature_info(path, mtime_ns, size):
+    """Parse a feature_info.json; keyed on (path, mtime, size) so each version is read once."""
+    with open(path, 'r') as f:
+        feature_info = json.load(f)
+    feature_names = tuple(feature_info.get("feature_names", []))
+    return feature_names, feature_info.get("n_features", len(feature_names))
+
+
+def load_feature_info(path=FEATURE_INFO_PATH):
+    """
+    Load (feature_names, n_features) from feature_info.json.
+
+    The file is only re-parsed when its mtime or size changes. feature_names is
+    a tuple shared between callers; copy it to a list before modifying.
+    """
+    stat = Path(path).stat()
+    return _load_feature_info(str(path), stat.st_mtime_ns, stat.st_size)
+
+
 # --- Load the exact feature list required by the models ---
 # NOTE: We use CICIoT2023 features (46) for the system
 try:
-    FEATURE_INFO_PATH = Path('trained_models/retrained/feature_info.json')
-    with open(FEATURE_INFO_PATH, 'r') as f:
-        _feature_info = json.load(f)
-    REQUIRED_FEATURES = _feature_info.get("feature_names", [])
+    REQUIRED_FEATURES = list(load_feature_info()[0])
     if not REQUIRED_FEATURES:
         raise ValueError("Feature list is empty in feature_info.json")
 except Exception as e:
@@ -47,249 +70,406 @@ def engineer_features_from_flow(packets):
         packets: List of Scapy packet objects
 
     Returns:
-        pd.DataFrame: Single-row DataFrame with the required model features.
+        np.ndarray: float32 array of shape (1, n_features) in MODEL_FEATURE_COLUMNS
+        order (shape (0, n_features) for no packets).
     """
     if not packets:
-        return pd.DataFrame()
-
-    # --- Basic packet analysis ---
-    first_pkt = packets[0]
-    src_ip = first_pkt[IP].src if IP in first_pkt else None
-    dst_ip = first_pkt[IP].dst if IP in first_pkt else None
-
-    # Protocol detection
-    protocol = first_pkt[IP].proto if IP in first_pkt else 0
-
-    # --- Timing and basic metrics ---
-    times = np.array([pkt.time for pkt in packets])
-    sizes = np.array([len(pkt) for pkt in packets])
-
-    flow_duration = times[-1] - times[0] if len(times) > 1 else 0.0
-    total_packets = len(packets)
-    total_bytes = sizes.sum()
-
-    # --- Header length calculation ---
-    header_lengths = []
-    for pkt in packets:
-        if IP in pkt:
-            ip_hdr = pkt[IP].ihl * 4 if pkt[IP].ihl else 20
-            if TCP in pkt:
-                tcp_hdr = (pkt[TCP].dataofs or 5) * 4
-                header_lengths.append(ip_hdr + tcp_hdr)
-            elif UDP in pkt:
-                header_lengths.append(ip_hdr + 8)
-            else:
-                header_lengths.append(ip_hdr)
-        else:
-            header_lengths.append(0)
-
-    header_length = np.mean(header_lengths) if header_lengths else 0
-
-    # --- Protocol type (numeric encoding) ---
-    # TCP=6, UDP=17, ICMP=1, etc.
-    protocol_type = protocol
-
-    # --- Duration (same as flow_duration) ---
-    duration = flow_duration
-
-    # --- Rates ---
-    rate = total_packets / duration if duration > 0 else total_packets  # Total packet rate
-
-    # Split by direction
-    fwd_packets = []
-    bwd_packets = []
-    fwd_bytes = 0
-    bwd_bytes = 0
-
-    for pkt in packets:
-        if IP not in pkt:
+        return np.empty((0, len(MODEL_FEATURE_COLUMNS)), dtype=np.float32)
+
+    first_ip = packets[0].getlayer(IP)
+    src_ip = first_ip.src if first_ip is not None else None
+    src_raw = socket.inet_aton(src_ip) if src_ip is not None else None
+    protocol = first_ip.proto if first_ip is not None else 0
+
+    # --- Single pass: fill one column per packet attribute ---
+    n = len(packets)
+    times = np.empty(n, dtype=np.float64)
+    sizes = np.empty(n, dtype=np.int32)
+    tcp_flags = np.zeros(n, dtype=np.uint8)
+    header_lengths = np.zeros(n, dtype=np.int32)
+    sports = np.zeros(n, dtype=np.int32)
+    dports = np.zeros(n, dtype=np.int32)
+    l4_protos = np.full(n, NON_IP_PROTO, dtype=np.int32)
+    ip_mask = np.zeros(n, dtype=bool)
+    bwd_mask = np.zeros(n, dtype=bool)
+
+    for i, pkt in enumerate(packets):
+        times[i] = float(pkt.time)
+
+        # Captured packets: read the fixed headers straight from the wire bytes
+        parsed = _parse_raw_headers(pkt)
+        if parsed is not None:
+            sizes[i] = len(pkt.original)
+            l4_proto, header, sport, dport, flags, src = parsed
+            l4_protos[i] = l4_proto
+            if l4_proto != ARP_PROTO:
+                ip_mask[i] = True
+                bwd_mask[i] = src != src_raw
+                header_lengths[i] = header
+                sports[i] = sport
+                dports[i] = dport
+                tcp_flags[i] = flags
             continue
-        pkt_size = len(pkt)
-        if pkt[IP].src == src_ip:
-            fwd_packets.append(pkt)
-            fwd_bytes += pkt_size
-        else:
-            bwd_packets.append(pkt)
-            bwd_bytes += pkt_size
-
-    srate = len(fwd_packets) / duration if duration > 0 else 0.0  # Source rate
-    drate = len(bwd_packets) / duration if duration > 0 else 0.0  # Destination rate
-
-    # --- Flag counts ---
-    fin_flag_number = 0
-    syn_flag_number = 0
-    rst_flag_number = 0
-    psh_flag_number = 0
-    ack_flag_number = 0
-    ece_flag_number = 0
-    cwr_flag_number = 0
-    urg_count = 0
-
-    for pkt in packets:
-        if TCP in pkt:
-            flags = pkt[TCP].flags
-            fin_flag_number += int('F' in flags)
-            syn_flag_number += int('S' in flags)
-            rst_flag_number += int('R' in flags)
-            psh_flag_number += int('P' in flags)
-            ack_flag_number += int('A' in flags)
-            ece_flag_number += int('E' in flags)
-            cwr_flag_number += int('C' in flags)
-            urg_count += int('U' in flags)
-    ack_count = ack_flag_number
-    syn_count = syn_flag_number
-    fin_count = fin_flag_number
-    rst_count = rst_flag_number
-    has_http = 0
-    has_https = 0
-    has_dns = 0
-    has_telnet = 0
-    has_smtp = 0
-    has_ssh = 0
-    has_irc = 0
-    has_tcp = 0
-    has_udp = 0
-    has_dhcp = 0
-    has_arp = 0
-    has_icmp = 0
-    has_ipv = 0
-    has_llc = 0
-
-    for pkt in packets:
-        if TCP in pkt:
-            has_tcp = 1
-            sport = pkt[TCP].sport
-            dport = pkt[TCP].dport
-            if sport == 80 or dport == 80:
-                has_http = 1
-            if sport == 443 or dport == 443:
-                has_https = 1
-            if sport == 23 or dport == 23:
-                has_telnet = 1
-            if sport == 25 or dport == 25:
-                has_smtp = 1
-            if sport == 22 or dport == 22:
-                has_ssh = 1
-            if sport in [6667, 6668, 6669] or dport in [6667, 6668, 6669]:
-                has_irc = 1
-        elif UDP in pkt:
-            has_udp = 1
-            sport = pkt[UDP].sport
-            dport = pkt[UDP].dport
-            if sport == 53 or dport == 53:
-                has_dns = 1
-            if sport == 67 or dport == 68 or sport == 68 or dport == 67:
-                has_dhcp = 1
+
+        sizes[i] = len(pkt)
+
+        # Each layer is looked up once per packet
+        tcp = pkt.getlayer(TCP)
+        udp = pkt.getlayer(UDP) if tcp is None else None
+        if tcp is not None:
+            tcp_flags[i] = int(tcp.flags) & 0xFF
+            sports[i] = tcp.sport
+            dports[i] = tcp.dport
+            l4_protos[i] = 6
+        elif udp is not None:
+            sports[i] = udp.sport
+            dports[i] = udp.dport
+            l4_protos[i] = 17
         elif ICMP in pkt:
-            has_icmp = 1
+            l4_protos[i] = 1
         elif ARP in pkt:
-            has_arp = 1
-
-        if IP in pkt:
-            has_ipv = 1
-
-    # --- Statistical features ---
-    tot_sum = total_bytes
-    min_size = np.min(sizes) if len(sizes) > 0 else 0
-    max_size = np.max(sizes) if len(sizes) > 0 else 0
-    avg_size = np.mean(sizes) if len(sizes) > 0 else 0
-    std_size = np.std(sizes) if len(sizes) > 0 else 0
-    tot_size = total_bytes
-    # --- Inter-arrival time (IAT) ---
-    if len(times) > 1:
-        iats = np.diff(times)
-        iat = np.mean(iats)
-    else:
-        iat = 0.0
-
-    # --- Number of packets ---
-    number = total_packets
-    # --- Advanced features ---
-   
-    magnitude = np.sqrt(np.sum(sizes ** 2)) if len(sizes) > 0 else 0
-
-    # Radius: Mean distance from centroid
-    if len(sizes) > 1:
-        centroid = np.mean(sizes)
-        radius = np.mean(np.abs(sizes - centroid))
-    else:
-        radius = 0
-
-    # Covariance: Between packet size and inter-arrival time
-    if len(times) > 1 and len(sizes) > 1:
-        iats_full = np.diff(times)
-        sizes_for_cov = sizes[:-1]  # Match length with IATs
-        if len(iats_full) == len(sizes_for_cov):
-            covariance = np.cov(sizes_for_cov, iats_full)[0, 1]
-        else:
-            covariance = 0
+            l4_protos[i] = ARP_PROTO
+
+        ip = pkt.getlayer(IP)
+        if ip is not None:
+            ip_mask[i] = True
+            bwd_mask[i] = ip.src != src_ip
+            header = ip.ihl * 4 if ip.ihl else 20
+            if tcp is not None:
+                header += (tcp.dataofs or 5) * 4
+            elif udp is not None:
+                header += 8
+            header_lengths[i] = header
+
+    vector = _feature_vector(
+        times, sizes, tcp_flags, header_lengths, sports, dports, protocol,
+        l4_protos, ip_mask, bwd_mask,
+    )
+    np.nan_to_num(vector, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return vector[_MODEL_ORDER].astype(np.float32).reshape(1, -1)
+
+
+def engineer_features_from_flow_df(packets):
+    """engineer_features_from_flow as a single-row DataFrame."""
+    return features_to_frame(engineer_features_from_flow(packets))
+
+
+def features_to_frame(features):
+    """Wrap engineer_features_from_flow output in a DataFrame with the model's column names."""
+    return pd.DataFrame(features, columns=_MODEL_FEATURE_INDEX, copy=False)
+
+
+# Per-packet protocol codes for engineer_features_from_arrays; IP packets use their
+# IP protocol number (0-255)
+ARP_PROTO = 0x0806
+NON_IP_PROTO = -1
+
+# Fixed header layouts (RFC 791/793/768) for _parse_raw_headers
+ETH_HEADER_LEN = 14
+ETH_P_IP = 0x0800
+ETH_TYPE = struct.Struct('!12xH')
+IPV4_HEADER = struct.Struct('!BxH2xHxB2x4s')   # ver/ihl, total length, flags/frag, proto, src
+TCP_HEADER = struct.Struct('!HH8xBB')          # sport, dport, data offset, flags
+UDP_HEADER = struct.Struct('!HH')              # sport, dport
+# UDP ports Scapy decodes as tunnels (GRE-in-UDP, VXLAN); their inner layers need Scapy
+UDP_TUNNEL_PORTS = frozenset((4754, 4789, 4790, 6633, 8472, 48879))
+
+
+def _parse_raw_headers(pkt):
+    """
+    Read (l4_proto, header_length, sport, dport, tcp_flags, src) from the wire
+    bytes of a captured Ether/IPv4 or bare IPv4 packet.
+
+    Returns None whenever the result could differ from Scapy's own dissection
+    (built packets, non-IPv4 frames, fragments, tunnels, truncated headers), so
+    the caller falls back to layer access.
+    """
+    buf = pkt.original
+    if not buf:
+        return None
+
+    if isinstance(pkt, Ether):
+        if len(buf) < ETH_HEADER_LEN:
+            return None
+        eth_type = ETH_TYPE.unpack_from(buf)[0]
+        if eth_type == ARP_PROTO:
+            return ARP_PROTO, 0, 0, 0, 0, None
+        if eth_type != ETH_P_IP:
+            return None
+        offset = ETH_HEADER_LEN
+    elif isinstance(pkt, IP):
+        offset = 0
     else:
-        covariance = 0
-
-    # Variance
-    variance = np.var(sizes) if len(sizes) > 0 else 0
-
-    # Weight: Ratio of payload to total size
-    payload_sum = 0
-    for pkt in packets:
-        if TCP in pkt and hasattr(pkt[TCP], 'payload'):
-            payload_sum += len(pkt[TCP].payload)
-        elif UDP in pkt and hasattr(pkt[UDP], 'payload'):
-            payload_sum += len(pkt[UDP].payload)
-    weight = payload_sum / total_bytes if total_bytes > 0 else 0
-
-    # --- Build feature dictionary in exact required order ---
-    features = {
-        'flow_duration': flow_duration, 'Header_Length': header_length,
-        'Protocol Type': protocol_type, 'Duration': duration,
-        'Rate': rate, 'Drate': drate,
-        'fin_flag_number': fin_flag_number, 'syn_flag_number': syn_flag_number,
-        'psh_flag_number': psh_flag_number, 'ack_flag_number': ack_flag_number,
-        'ece_flag_number': ece_flag_number,'cwr_flag_number': cwr_flag_number,
-        'syn_count': syn_count, 'fin_count': fin_count,
-        'urg_count': urg_count, 'rst_count': rst_count,
-        'HTTP': has_http, 'HTTPS': has_https,
-        'DNS': has_dns, 'Telnet': has_telnet,
-        'SMTP': has_smtp, 'SSH': has_ssh,
-        'IRC': has_irc, 'TCP': has_tcp,
-        'UDP': has_udp,
-        'DHCP': has_dhcp,
-        'ARP': has_arp,
-        'ICMP': has_icmp,
-        'IPv': has_ipv,
-        'Tot sum': tot_sum,
-        'Min': min_size,
-        'Max': max_size,
-        'AVG': avg_size,
-        'Tot size': tot_size,
-        'IAT': iat,
-        'Covariance': covariance,
-        'Variance': variance
-    }
-
-    # The system now uses CICIoT2023 features (46) since that's the dataset the models were trained on
-    model_features = features
-
-    df = pd.DataFrame([model_features])
-    # Replace NaN and inf values with 0.0
-    df = df.replace([np.inf, -np.inf], 0.0)
-    df = df.fillna(0.0)
-
-    # Add debug logging to check for feature mismatches
-    expected_features = REQUIRED_FEATURES
-    actual_features = list(df.columns)
-    if len(actual_features) != len(expected_features):
-        print(f"[DEBUG] Feature count mismatch: expected {len(expected_features)}, got {len(actual_features)}")
-        print(f"[DEBUG] Expected: {expected_features}")
-        print(f"[DEBUG] Actual: {actual_features}")
-        missing = set(expected_features) - set(actual_features)
-        extra = set(actual_features) - set(expected_features)
-        if missing:
-            print(f"[DEBUG] Missing features: {missing}")
-        if extra:
-            print(f"[DEBUG] Extra features: {extra}")
-
-    return df
+        return None
+
+    if len(buf) < offset + 20:
+        return None
+    ver_ihl, total_length, frag, proto, src = IPV4_HEADER.unpack_from(buf, offset)
+    ip_header = (ver_ihl & 0x0F) * 4
+    if ver_ihl >> 4 != 4 or ip_header < 20 or total_length < ip_header or frag & 0x1FFF:
+        return None
+
+    # Scapy trims the IP payload to the total length field
+    l4 = offset + ip_header
+    l4_len = min(len(buf), offset + total_length) - l4
+
+    if proto == 6 and l4_len >= 20:
+        sport, dport, data_offset, flags = TCP_HEADER.unpack_from(buf, l4)
+        return 6, ip_header + ((data_offset >> 4) or 5) * 4, sport, dport, flags, src
+    if proto == 17 and l4_len >= 8:
+        sport, dport = UDP_HEADER.unpack_from(buf, l4)
+        if sport in UDP_TUNNEL_PORTS or dport in UDP_TUNNEL_PORTS:
+            return None
+        return 17, ip_header + 8, sport, dport, 0, src
+    if proto == 1 and l4_len > 0:
+        return 1, ip_header, 0, 0, 0, src
+    return None
+
+
+# Output order of _flow_features (and of the feature frames built from it)
+FEATURE_COLUMNS = (
+    'flow_duration', 'Header_Length', 'Protocol Type', 'Duration', 'Rate', 'Drate',
+    'fin_flag_number', 'syn_flag_number', 'psh_flag_number', 'ack_flag_number',
+    'ece_flag_number', 'cwr_flag_number', 'syn_count', 'fin_count', 'urg_count',
+    'rst_count', 'HTTP', 'HTTPS', 'DNS', 'Telnet', 'SMTP', 'SSH', 'IRC', 'TCP',
+    'UDP', 'DHCP', 'ARP', 'ICMP', 'IPv', 'Tot sum', 'Min', 'Max', 'AVG',
+    'Tot size', 'IAT', 'Covariance', 'Variance'
+)
+N_FEATURES = len(FEATURE_COLUMNS)
+_FEATURE_INDEX = pd.Index(FEATURE_COLUMNS)
+
+# engineer_features_from_flow returns model-ready arrays, so its columns follow the
+# model's feature order whenever the extractor covers every model feature
+if set(REQUIRED_FEATURES) <= set(FEATURE_COLUMNS):
+    _MODEL_ORDER = np.array([FEATURE_COLUMNS.index(name) for name in REQUIRED_FEATURES])
+else:
+    _MODEL_ORDER = np.arange(N_FEATURES)
+MODEL_FEATURE_COLUMNS = tuple(FEATURE_COLUMNS[i] for i in _MODEL_ORDER)
+_MODEL_FEATURE_INDEX = pd.Index(MODEL_FEATURE_COLUMNS)
+
+# Column layouts validate_features accepts without comparing names
+_EXPECTED_COLUMNS = tuple(REQUIRED_FEATURES)
+_MODEL_INDEX_VALID = MODEL_FEATURE_COLUMNS == _EXPECTED_COLUMNS
+_FEATURE_INDEX_VALID = FEATURE_COLUMNS == _EXPECTED_COLUMNS
+
+# The extractor's columns are fixed, so check them against the model's list once
+if len(FEATURE_COLUMNS) != len(REQUIRED_FEATURES):
+    print(f"[DEBUG] Feature count mismatch: expected {len(REQUIRED_FEATURES)}, got {len(FEATURE_COLUMNS)}")
+    print(f"[DEBUG] Expected: {REQUIRED_FEATURES}")
+    print(f"[DEBUG] Actual: {list(FEATURE_COLUMNS)}")
+    _missing = set(REQUIRED_FEATURES) - set(FEATURE_COLUMNS)
+    _extra = set(FEATURE_COLUMNS) - set(REQUIRED_FEATURES)
+    if _missing:
+        print(f"[DEBUG] Missing features: {_missing}")
+    if _extra:
+        print(f"[DEBUG] Extra features: {_extra}")
+
+
+# Application protocol bits, set per port in the lookup tables below
+HTTP_BIT, HTTPS_BIT, DNS_BIT, TELNET_BIT, SMTP_BIT, SSH_BIT, IRC_BIT, DHCP_BIT = (1 << b for b in range(8))
+
+# Port -> protocol bits, one table per transport, so classifying a packet is two loads
+_TCP_PORT_LUT = np.zeros(65536, dtype=np.uint16)
+_UDP_PORT_LUT = np.zeros(65536, dtype=np.uint16)
+for _port, _bit in ((80, HTTP_BIT), (443, HTTPS_BIT), (23, TELNET_BIT), (25, SMTP_BIT),
+                    (22, SSH_BIT), (6667, IRC_BIT), (6668, IRC_BIT), (6669, IRC_BIT)):
+    _TCP_PORT_LUT[_port] |= _bit
+for _port, _bit in ((53, DNS_BIT), (67, DHCP_BIT), (68, DHCP_BIT)):
+    _UDP_PORT_LUT[_port] |= _bit
+
+
+def _flow_features(ts, lengths, flags, header_lengths, sports, dports, l4_protos,
+                   ip_mask, bwd_mask, protocol):
+    """
+    Reduce per-packet arrays into the FEATURE_COLUMNS vector in one loop.
+
+    Size variance and the size/IAT covariance use Welford's online updates,
+    so they need no second pass and stay stable for large timestamps.
+    """
+    n = ts.shape[0]
+    out = np.zeros(N_FEATURES)
+    flag_counts = np.zeros(8)
+    total = 0.0
+    header_total = 0.0
+    lo = lengths[0]
+    hi = lengths[0]
+    n_bwd = 0
+    tcp = udp = icmp = arp = ipv = False
+    port_bits = 0
+    # Welford state: sizes over all packets; (size, following IAT) pairs
+    size_mean = 0.0
+    size_m2 = 0.0
+    pair_size_mean = 0.0
+    pair_iat_mean = 0.0
+    comoment = 0.0
+
+    for i in range(n):
+        size = lengths[i]
+        d = size - size_mean
+        size_mean += d / (i + 1)
+        size_m2 += d * (size - size_mean)
+        if i > 0:
+            # Pair i-1: the previous packet's size and the gap after it
+            dx = lengths[i - 1] - pair_size_mean
+            pair_size_mean += dx / i
+            pair_iat_mean += ((ts[i] - ts[i - 1]) - pair_iat_mean) / i
+            comoment += dx * ((ts[i] - ts[i - 1]) - pair_iat_mean)
+
+        total += size
+        if size < lo:
+            lo = size
+        if size > hi:
+            hi = size
+        header_total += header_lengths[i]
+        if bwd_mask[i]:
+            n_bwd += 1
+        if ip_mask[i]:
+            ipv = True
+
+        f = flags[i]
+        for b in range(8):
+            if (f >> b) & 1:
+                flag_counts[b] += 1
+
+        proto = l4_protos[i]
+        if proto == 6:
+            tcp = True
+            port_bits |= _TCP_PORT_LUT[sports[i] & 0xFFFF] | _TCP_PORT_LUT[dports[i] & 0xFFFF]
+        elif proto == 17:
+            udp = True
+            port_bits |= _UDP_PORT_LUT[sports[i] & 0xFFFF] | _UDP_PORT_LUT[dports[i] & 0xFFFF]
+        elif proto == 1:
+            icmp = True
+        elif proto == ARP_PROTO:
+            arp = True
+
+    mean = total / n
+    var = size_m2 / n
+
+    # Sample covariance between packet size and the following inter-arrival time
+    duration = ts[n - 1] - ts[0]
+    iat_mean = duration / (n - 1) if n > 1 else 0.0
+    cov = comoment / (n - 2) if n > 2 else 0.0
+
+    out[0] = duration
+    out[1] = header_total / n
+    out[2] = protocol
+    out[3] = duration
+    out[4] = n / duration if duration > 0 else n
+    out[5] = n_bwd / duration if duration > 0 else 0.0
+    # Flag counts by bit position: F=0 S=1 R=2 P=3 A=4 U=5 E=6 C=7
+    out[6] = flag_counts[0]
+    out[7] = flag_counts[1]
+    out[8] = flag_counts[3]
+    out[9] = flag_counts[4]
+    out[10] = flag_counts[6]
+    out[11] = flag_counts[7]
+    out[12] = flag_counts[1]
+    out[13] = flag_counts[0]
+    out[14] = flag_counts[5]
+    out[15] = flag_counts[2]
+    out[16] = (port_bits & HTTP_BIT) != 0
+    out[17] = (port_bits & HTTPS_BIT) != 0
+    out[18] = (port_bits & DNS_BIT) != 0
+    out[19] = (port_bits & TELNET_BIT) != 0
+    out[20] = (port_bits & SMTP_BIT) != 0
+    out[21] = (port_bits & SSH_BIT) != 0
+    out[22] = (port_bits & IRC_BIT) != 0
+    out[23] = tcp
+    out[24] = udp
+    out[25] = (port_bits & DHCP_BIT) != 0
+    out[26] = arp
+    out[27] = icmp
+    out[28] = ipv
+    out[29] = total
+    out[30] = lo
+    out[31] = hi
+    out[32] = mean
+    out[33] = total
+    out[34] = iat_mean
+    out[35] = cov
+    out[36] = var
+    return out
+
+
+try:
+    from numba import njit
+    # The explicit signature compiles (or loads from cache) at import, so the
+    # first live flow does not pay for JIT compilation
+    _flow_features_kernel = njit(
+        'f8[::1](f8[::1], i4[::1], u1[::1], i4[::1], i4[::1], i4[::1], i4[::1], b1[::1], b1[::1], i8)',
+        cache=True, fastmath=True, boundscheck=False
+    )(_flow_features)
+except ImportError:
+    _flow_features_kernel = _flow_features
+
+
+def engineer_features_from_arrays(times, sizes, tcp_flags, header_lengths, sports, dports,
+                                  protocol, l4_protos=None, ip_mask=None, bwd_mask=None, as_frame=True):
+    """
+    Extract the model features from per-packet arrays (Structure-of-Arrays layout).
+
+    engineer_features_from_flow reduces Scapy packets to these arrays and calls
+    this; long-running collectors can call it directly and keep only scalars.
+
+    Args:
+        times: float64 array of packet timestamps in arrival order
+        sizes: integer array of packet lengths
+        tcp_flags: uint8 array of TCP flag bitmasks (0 for non-TCP packets)
+        header_lengths: integer array of IP + L4 header lengths (0 for non-IP packets)
+        sports, dports: integer arrays of source/destination ports (0 if none)
+        protocol: IP protocol number of the flow's first packet ('Protocol Type')
+        l4_protos: optional per-packet protocol codes: the IP protocol number,
+            ARP_PROTO for ARP, or NON_IP_PROTO for anything else. Defaults to
+            `protocol` for every packet.
+        ip_mask: optional bool array, True for packets with an IPv4 layer
+            ('IPv'). Defaults to packets whose l4_protos code is an IP protocol.
+        bwd_mask: optional bool array, True for packets sent towards the initiator
+        as_frame: if False, return the raw feature dict so callers can batch many
+            flows into one DataFrame (NaN/inf are then left to the caller)
+
+    Returns:
+        pd.DataFrame: Single-row DataFrame with the required model features.
+    """
+    if len(times) == 0:
+        return pd.DataFrame() if as_frame else {}
+
+    vector = _feature_vector(
+        times, sizes, tcp_flags, header_lengths, sports, dports, protocol,
+        l4_protos, ip_mask, bwd_mask,
+    )
+    if not as_frame:
+        return dict(zip(FEATURE_COLUMNS, vector.tolist()))
+
+    # The kernel returns a fresh vector per call, so the frame can wrap it without copying
+    np.nan_to_num(vector, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return pd.DataFrame(vector.reshape(1, -1), columns=_FEATURE_INDEX, copy=False)
+
+
+def _feature_vector(times, sizes, tcp_flags, header_lengths, sports, dports,
+                    protocol, l4_protos, ip_mask, bwd_mask):
+    """Run the feature kernel on non-empty per-packet arrays; FEATURE_COLUMNS order."""
+    total_packets = len(times)
+    if l4_protos is None:
+        l4_protos = np.full(total_packets, protocol, dtype=np.int32)
+    l4_protos = np.ascontiguousarray(l4_protos, dtype=np.int32)
+    if ip_mask is None:
+        ip_mask = (l4_protos >= 0) & (l4_protos < 256)
+    if bwd_mask is None:
+        bwd_mask = np.zeros(total_packets, dtype=bool)
+
+    return _flow_features_kernel(
+        np.ascontiguousarray(times, dtype=np.float64),
+        np.ascontiguousarray(sizes, dtype=np.int32),
+        np.ascontiguousarray(tcp_flags, dtype=np.uint8),
+        np.ascontiguousarray(header_lengths, dtype=np.int32),
+        np.ascontiguousarray(sports, dtype=np.int32),
+        np.ascontiguousarray(dports, dtype=np.int32),
+        l4_protos,
+        np.ascontiguousarray(ip_mask, dtype=np.bool_),
+        np.ascontiguousarray(bwd_mask, dtype=np.bool_),
+        int(protocol),
+    )
 
 
 def get_feature_names():
@@ -305,6 +485,15 @@ def validate_features(features_df):
     Args: features_df: DataFrame to validate.
     Returns: bool: True if valid, otherwise raises a ValueError.
     """
+    # Frames built by this module share an Index object checked once at import
+    if features_df.columns is _MODEL_FEATURE_INDEX and _MODEL_INDEX_VALID:
+        return True
+    if features_df.columns is _FEATURE_INDEX and _FEATURE_INDEX_VALID:
+        return True
+    if tuple(features_df.columns) == _EXPECTED_COLUMNS:
+        return True
+
+    # Slow path: explain the mismatch
     expected_features = get_feature_names()
     n_expected = len(expected_features)
     if features_df.shape[1] != n_expected:
@@ -318,6 +507,4 @@ def validate_features(features_df):
     if extra_features:
         raise ValueError(f"The following extra features were found: {extra_features}")
 
-    if not all(features_df.columns == expected_features):
-        raise ValueError("The feature columns are not in the expected order.")
-    return True
+    raise ValueError("The feature columns are not in the expected order.")
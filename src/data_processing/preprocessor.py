@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
@@ -10,25 +11,67 @@ def preprocess_data(df, target_column='Label'):
     X = df.drop(target_column, axis=1)
     y = df[target_column]
 
-    # Handle missing values
+    # Handle missing values; float32 features halve memory for the models downstream
     imputer = SimpleImputer(strategy='mean')
-    X_imputed = pd.DataFrame(imputer.fit_transform(X), columns=X.columns)
+    X_imputed = pd.DataFrame(
+        imputer.fit_transform(X).astype(np.float32, copy=False), columns=X.columns, copy=False
+    )
 
     # Encode target if categorical
     if y.dtype == 'object':
         encoder = LabelEncoder()
-        y_encoded = encoder.fit_transform(y)
+        y_encoded = encoder.fit_transform(y).astype(np.int32)
         return X_imputed, y_encoded, encoder
     else:
         return X_imputed, y, None
 
 def scale_features(X_train, X_test=None):
     """
-    Scale features using StandardScaler.
+    Scale features using StandardScaler, returning float32 arrays.
+    The scaler's mean/variance are still accumulated in float64.
     """
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
+    # Scale private float32 copies in place rather than copying again
+    scaler = StandardScaler(copy=False)
+    X_train_scaled = scaler.fit_transform(np.array(X_train, dtype=np.float32))
     if X_test is not None:
-        X_test_scaled = scaler.transform(X_test)
+        X_test_scaled = scaler.transform(np.array(X_test, dtype=np.float32))
         return X_train_scaled, X_test_scaled, scaler
     return X_train_scaled, scaler
+
+def fit_preprocessing_chunked(csv_path, target_column='Label', chunksize=200_000):
+    """
+    Fit the mean imputation, label encoding and scaling of preprocess_data and
+    scale_features over a CSV read in chunks, so only one chunk is in memory.
+
+    Returns (fill_values, scaler, encoder); apply them with iter_preprocessed_chunks.
+    """
+    # Pass 1: per-column means for imputation, and the label classes
+    sums, counts, labels = None, None, set()
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        X = chunk.drop(target_column, axis=1)
+        sums = X.sum() if sums is None else sums.add(X.sum(), fill_value=0)
+        counts = X.count() if counts is None else counts.add(X.count(), fill_value=0)
+        labels.update(chunk[target_column].unique())
+    fill_values = sums / counts
+
+    # Pass 2: scaler statistics over the imputed values
+    scaler = StandardScaler()
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        scaler.partial_fit(chunk.drop(target_column, axis=1).fillna(fill_values).to_numpy(dtype=np.float32))
+
+    encoder = None
+    if not all(pd.api.types.is_number(label) for label in labels):
+        encoder = LabelEncoder().fit(sorted(labels, key=str))
+    return fill_values, scaler, encoder
+
+def iter_preprocessed_chunks(csv_path, fill_values, scaler, encoder=None,
+                             target_column='Label', chunksize=200_000):
+    """
+    Yield (X_scaled, y) per chunk of a CSV using the fitted output of
+    fit_preprocessing_chunked.
+    """
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        X = chunk.drop(target_column, axis=1).fillna(fill_values)
+        y = chunk[target_column]
+        X_scaled = scaler.transform(X.to_numpy(dtype=np.float32))
+        yield X_scaled, (encoder.transform(y).astype(np.int32) if encoder is not None else y.to_numpy())
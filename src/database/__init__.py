@@ -4,5 +4,6 @@ Database package for network flow storage and management
 
 from src.database.models import NetworkFlow, ModelTrainingMetadata, DatasetExport
 from src.database.db_manager import DatabaseManager
+from src.database.parquet_sink import ParquetFlowSink
 
-__all__ = ['NetworkFlow', 'ModelTrainingMetadata', 'DatasetExport', 'DatabaseManager']
+__all__ = ['NetworkFlow', 'ModelTrainingMetadata', 'DatasetExport', 'DatabaseManager', 'ParquetFlowSink']
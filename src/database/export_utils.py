@@ -5,10 +5,12 @@ Tools to export database flows for model training and retraining.
 """
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -16,33 +18,45 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.database.db_manager import DatabaseManager
 
 
+@lru_cache(maxsize=None)
+def get_db_manager(db_path: str = None) -> DatabaseManager:
+    """
+    Shared DatabaseManager per database path, so consecutive exports reuse one
+    engine and connection pool and create/verify the schema only once.
+    """
+    if db_path:
+        return DatabaseManager(db_url=f"sqlite:///{db_path}")
+    return DatabaseManager()
+
+
 def export_for_training(
     output_path: str,
     days: int = 30,
     attack_types: list = None,
     include_benign: bool = True,
     min_confidence: float = 0.8,
-    db_path: str = None
+    db_path: str = None,
+    db_manager: DatabaseManager = None,
+    file_format: str = 'csv'
 ):
     """
-    Export database flows to CSV for model training.
+    Export database flows to CSV or Parquet for model training.
 
     Args:
-        output_path: Path to save CSV file
+        output_path: Path to save the file
         days: Export data from last N days
         attack_types: List of specific attack types to include
         include_benign: Include benign flows (default: True)
         min_confidence: Minimum confidence threshold for predictions
         db_path: Custom database path (optional)
+        db_manager: Manager to use instead of get_db_manager(db_path) (optional)
+        file_format: 'csv' or 'parquet' (typed, compressed; default: csv)
 
     Returns:
         Number of records exported
     """
-    # Initialize database manager
-    if db_path:
-        db_manager = DatabaseManager(db_url=f"sqlite:///{db_path}")
-    else:
-        db_manager = DatabaseManager()
+    if db_manager is None:
+        db_manager = get_db_manager(db_path)
 
     # Calculate date range
     end_date = datetime.utcnow()
@@ -53,30 +67,21 @@ def export_for_training(
     print(f"Include benign: {include_benign}")
     print(f"Min confidence: {min_confidence}")
 
-    # Export to CSV
-    count = db_manager.export_to_csv(
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError("Unsupported file format. Use csv or parquet.")
+
+    # Export, keeping flows with high confidence or no prediction (for labeling)
+    export = db_manager.export_to_parquet if file_format == 'parquet' else db_manager.export_to_csv
+    count = export(
         output_path=output_path,
         start_date=start_date,
         end_date=end_date,
         attack_types=attack_types,
         include_benign=include_benign,
-        include_predictions=True
+        include_predictions=True,
+        min_confidence=min_confidence if min_confidence > 0 else None
     )
 
-    # Filter by confidence if specified
-    if min_confidence > 0:
-        print(f"\nFiltering by confidence >= {min_confidence}")
-        df = pd.read_csv(output_path)
-        original_count = len(df)
-
-        # Keep flows with high confidence or no prediction (for labeling)
-        df_filtered = df[(df['confidence'] >= min_confidence) | (df['confidence'].isna())]
-
-        df_filtered.to_csv(output_path, index=False)
-        filtered_count = len(df_filtered)
-        print(f"Kept {filtered_count}/{original_count} flows after confidence filtering")
-        count = filtered_count
-
     print(f"\n[OK] Exported {count} flows to {output_path}")
     return count
 
@@ -85,25 +90,29 @@ def export_attack_samples(
     output_dir: str,
     min_samples_per_class: int = 100,
     days: int = 30,
-    db_path: str = None
+    db_path: str = None,
+    db_manager: DatabaseManager = None,
+    file_format: str = 'csv'
 ):
     """
     Export balanced samples for each attack type.
 
     Args:
-        output_dir: Directory to save CSV files
+        output_dir: Directory to save sample files
         min_samples_per_class: Minimum samples per attack type
         days: Export data from last N days
+        file_format: 'csv' or 'parquet' (typed, compressed; default: csv)
         db_path: Custom database path (optional)
+        db_manager: Manager to use instead of get_db_manager(db_path) (optional)
 
     Returns:
         Dictionary with attack types and sample counts
     """
-    # Initialize database manager
-    if db_path:
-        db_manager = DatabaseManager(db_url=f"sqlite:///{db_path}")
-    else:
-        db_manager = DatabaseManager()
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError("Unsupported file format. Use csv or parquet.")
+
+    if db_manager is None:
+        db_manager = get_db_manager(db_path)
 
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -127,19 +136,24 @@ def export_attack_samples(
     for attack, count in attack_counts.items():
         print(f"  {attack}: {count}")
 
-    # Export each attack type
+    # Export each attack type (one hash partition of the frame); the files are
+    # independent and pandas releases the GIL while writing, so write them concurrently
     results = {}
-    for attack_type in attack_counts.index:
-        attack_df = df[df['predicted_attack'] == attack_type]
-
-        if len(attack_df) >= min_samples_per_class:
-            # Save to separate CSV
-            filename = output_path / f"{attack_type.lower().replace(' ', '_')}_samples.csv"
-            attack_df.to_csv(filename, index=False)
-            results[attack_type] = len(attack_df)
-            print(f"[OK] Saved {len(attack_df)} samples of {attack_type} to {filename}")
-        else:
-            print(f"[SKIP] {attack_type}: Only {len(attack_df)} samples (need {min_samples_per_class})")
+    writes = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for attack_type, attack_df in df.groupby('predicted_attack', sort=False):
+            if len(attack_df) >= min_samples_per_class:
+                # Save to separate file
+                filename = output_path / f"{attack_type.lower().replace(' ', '_')}_samples.{file_format}"
+                writer = attack_df.to_parquet if file_format == 'parquet' else attack_df.to_csv
+                writes.append((attack_type, len(attack_df), filename, executor.submit(writer, filename, index=False)))
+            else:
+                print(f"[SKIP] {attack_type}: Only {len(attack_df)} samples (need {min_samples_per_class})")
+
+    for attack_type, count, filename, write in writes:
+        write.result()
+        results[attack_type] = count
+        print(f"[OK] Saved {count} samples of {attack_type} to {filename}")
 
     return results
 
@@ -147,7 +161,8 @@ def export_attack_samples(
 def export_labeled_data(
     output_path: str,
     only_verified: bool = True,
-    db_path: str = None
+    db_path: str = None,
+    db_manager: DatabaseManager = None
 ):
     """
     Export flows with ground truth labels for supervised learning.
@@ -156,55 +171,32 @@ def export_labeled_data(
         output_path: Path to save CSV file
         only_verified: Only export verified labels (default: True)
         db_path: Custom database path (optional)
+        db_manager: Manager to use instead of get_db_manager(db_path) (optional)
 
     Returns:
         Number of records exported
     """
-    # Initialize database manager
-    if db_path:
-        db_manager = DatabaseManager(db_url=f"sqlite:///{db_path}")
-    else:
-        db_manager = DatabaseManager()
+    if db_manager is None:
+        db_manager = get_db_manager(db_path)
 
     # Get all flows with labels
-    with db_manager.get_session() as session:
-        from src.database.models import NetworkFlow
-
-        query = session.query(NetworkFlow).filter(NetworkFlow.label.isnot(None))
-
-        if only_verified:
-            query = query.filter(NetworkFlow.label_verified == True)
+    df = db_manager.export_labeled_to_dataframe(only_verified=only_verified)
 
-        flows = query.all()
-
-        if not flows:
-            print("[!] No labeled flows found in database")
-            return 0
-
-        # Convert to DataFrame
-        data = []
-        for flow in flows:
-            row = flow.get_features_dict()
-            row['label'] = flow.label
-            row['label_verified'] = flow.label_verified
-            row['predicted_attack'] = flow.predicted_attack
-            row['confidence'] = flow.confidence
-            row['timestamp'] = flow.timestamp
-            data.append(row)
-
-        df = pd.DataFrame(data)
+    if df.empty:
+        print("[!] No labeled flows found in database")
+        return 0
 
-        # Save to CSV
-        df.to_csv(output_path, index=False)
+    # Save to CSV
+    df.to_csv(output_path, index=False)
 
-        print(f"[OK] Exported {len(df)} labeled flows to {output_path}")
+    print(f"[OK] Exported {len(df)} labeled flows to {output_path}")
 
-        # Show label distribution
-        print("\nLabel distribution:")
-        for label, count in df['label'].value_counts().items():
-            print(f"  {label}: {count}")
+    # Show label distribution
+    print("\nLabel distribution:")
+    for label, count in df['label'].value_counts().items():
+        print(f"  {label}: {count}")
 
-        return len(df)
+    return len(df)
 
 
 def main():
@@ -215,12 +207,14 @@ def main():
 
     # Export for training
     train_parser = subparsers.add_parser('train', help='Export data for model training')
-    train_parser.add_argument('--output', '-o', required=True, help='Output CSV path')
+    train_parser.add_argument('--output', '-o', required=True, help='Output file path')
     train_parser.add_argument('--days', '-d', type=int, default=30, help='Export last N days (default: 30)')
     train_parser.add_argument('--attacks', '-a', nargs='+', help='Specific attack types to include')
     train_parser.add_argument('--no-benign', action='store_true', help='Exclude benign flows')
     train_parser.add_argument('--min-confidence', type=float, default=0.8, help='Minimum confidence (default: 0.8)')
     train_parser.add_argument('--db', help='Custom database path')
+    train_parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                              help='Output file format (default: csv)')
 
     # Export attack samples
     samples_parser = subparsers.add_parser('samples', help='Export balanced samples per attack type')
@@ -228,6 +222,8 @@ def main():
     samples_parser.add_argument('--min-samples', type=int, default=100, help='Min samples per class (default: 100)')
     samples_parser.add_argument('--days', '-d', type=int, default=30, help='Export last N days (default: 30)')
     samples_parser.add_argument('--db', help='Custom database path')
+    samples_parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                                help='Output file format (default: csv)')
 
     # Export labeled data
     label_parser = subparsers.add_parser('labels', help='Export labeled data for supervised learning')
@@ -244,7 +240,8 @@ def main():
             attack_types=args.attacks,
             include_benign=not args.no_benign,
             min_confidence=args.min_confidence,
-            db_path=args.db
+            db_path=args.db,
+            file_format=args.format
         )
 
     elif args.command == 'samples':
@@ -252,7 +249,8 @@ def main():
             output_dir=args.output_dir,
             min_samples_per_class=args.min_samples,
             days=args.days,
-            db_path=args.db
+            db_path=args.db,
+            file_format=args.format
         )
 
     elif args.command == 'labels':
@@ -9,8 +9,8 @@ Stores network flow features for:
 """
 
 from sqlalchemy import (
-    Column, Integer, Float, String, DateTime, Boolean,
-    Text, Index, create_engine
+    Column, Integer, SmallInteger, Float, String, DateTime, Boolean,
+    Text, Index, MetaData, Table, create_engine
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -19,6 +19,10 @@ import json
 
 Base = declarative_base()
 
+# Model features are float32 end to end, so store them single precision
+# (REAL on PostgreSQL; SQLite keeps its 8-byte REAL)
+FeatureFloat = Float(precision=24)
+
 
 class NetworkFlow(Base):
     """
@@ -41,26 +45,26 @@ class NetworkFlow(Base):
     # === CICIoT2023 Features (46 total) ===
 
     # Time-based features
-    flow_duration = Column(Float, nullable=False)
-    Duration = Column(Float, nullable=False)
+    flow_duration = Column(FeatureFloat, nullable=False)
+    Duration = Column(FeatureFloat, nullable=False)
 
     # Header features
-    Header_Length = Column(Float, nullable=False)
+    Header_Length = Column(FeatureFloat, nullable=False)
     Protocol_Type = Column(Integer, nullable=False)
 
     # Rate features
-    Rate = Column(Float, nullable=True)
-    Srate = Column(Float, nullable=True)  # No longer used by retrained model
-    Drate = Column(Float, nullable=True)
+    Rate = Column(FeatureFloat, nullable=True)
+    Srate = Column(FeatureFloat, nullable=True)  # No longer used by retrained model
+    Drate = Column(FeatureFloat, nullable=True)
 
     # TCP flag counts
-    fin_flag_number = Column(Integer, default=0)
-    syn_flag_number = Column(Integer, default=0)
-    rst_flag_number = Column(Integer, default=0, nullable=True) # No longer used
-    psh_flag_number = Column(Integer, default=0)
-    ack_flag_number = Column(Integer, default=0)
-    ece_flag_number = Column(Integer, default=0)
-    cwr_flag_number = Column(Integer, default=0)
+    fin_flag_number = Column(SmallInteger, default=0)
+    syn_flag_number = Column(SmallInteger, default=0)
+    rst_flag_number = Column(SmallInteger, default=0, nullable=True) # No longer used
+    psh_flag_number = Column(SmallInteger, default=0)
+    ack_flag_number = Column(SmallInteger, default=0)
+    ece_flag_number = Column(SmallInteger, default=0)
+    cwr_flag_number = Column(SmallInteger, default=0)
     ack_count = Column(Integer, default=0, nullable=True) # No longer used
     syn_count = Column(Integer, default=0)
     fin_count = Column(Integer, default=0)
@@ -68,37 +72,37 @@ class NetworkFlow(Base):
     rst_count = Column(Integer, default=0)
 
     # Protocol indicators (binary 0/1)
-    HTTP = Column(Integer, default=0)
-    HTTPS = Column(Integer, default=0)
-    DNS = Column(Integer, default=0)
-    Telnet = Column(Integer, default=0)
-    SMTP = Column(Integer, default=0)
-    SSH = Column(Integer, default=0)
-    IRC = Column(Integer, default=0)
-    TCP = Column(Integer, default=0)
-    UDP = Column(Integer, default=0)
-    DHCP = Column(Integer, default=0)
-    ARP = Column(Integer, default=0)
-    ICMP = Column(Integer, default=0)
-    IPv = Column(Integer, default=0)
-    LLC = Column(Integer, default=0, nullable=True) # No longer used
+    HTTP = Column(SmallInteger, default=0)
+    HTTPS = Column(SmallInteger, default=0)
+    DNS = Column(SmallInteger, default=0)
+    Telnet = Column(SmallInteger, default=0)
+    SMTP = Column(SmallInteger, default=0)
+    SSH = Column(SmallInteger, default=0)
+    IRC = Column(SmallInteger, default=0)
+    TCP = Column(SmallInteger, default=0)
+    UDP = Column(SmallInteger, default=0)
+    DHCP = Column(SmallInteger, default=0)
+    ARP = Column(SmallInteger, default=0)
+    ICMP = Column(SmallInteger, default=0)
+    IPv = Column(SmallInteger, default=0)
+    LLC = Column(SmallInteger, default=0, nullable=True) # No longer used
 
     # Statistical features
-    Tot_sum = Column(Float, nullable=True)
-    Min = Column(Float, nullable=True)
-    Max = Column(Float, nullable=True)
-    AVG = Column(Float, nullable=True)
-    Std = Column(Float, nullable=True) # No longer used
-    Tot_size = Column(Float, nullable=True)
-    IAT = Column(Float, nullable=True)  # Inter-arrival time
+    Tot_sum = Column(FeatureFloat, nullable=True)
+    Min = Column(FeatureFloat, nullable=True)
+    Max = Column(FeatureFloat, nullable=True)
+    AVG = Column(FeatureFloat, nullable=True)
+    Std = Column(FeatureFloat, nullable=True) # No longer used
+    Tot_size = Column(FeatureFloat, nullable=True)
+    IAT = Column(FeatureFloat, nullable=True)  # Inter-arrival time
     Number = Column(Integer, nullable=True)  # No longer used
 
     # Advanced features
-    Magnitue = Column(Float, nullable=True)  # No longer used
-    Radius = Column(Float, nullable=True)  # No longer used
-    Covariance = Column(Float, nullable=True)
-    Variance = Column(Float, nullable=True)
-    Weight = Column(Float, nullable=True)  # No longer used
+    Magnitue = Column(FeatureFloat, nullable=True)  # No longer used
+    Radius = Column(FeatureFloat, nullable=True)  # No longer used
+    Covariance = Column(FeatureFloat, nullable=True)
+    Variance = Column(FeatureFloat, nullable=True)
+    Weight = Column(FeatureFloat, nullable=True)  # No longer used
 
     # === Prediction Results ===
     predicted_attack = Column(String(100), nullable=True)
@@ -118,7 +122,11 @@ class NetworkFlow(Base):
 
     # Indexes for common queries
     __table_args__ = (
-        Index('idx_timestamp_attack', 'timestamp', 'predicted_attack'),
+        # Covers the time-window reads (newest first via a backward scan) and
+        # their attack/anomaly filters; Postgres can answer score and
+        # confidence lookups from the index alone
+        Index('ix_flows_ts_attack_anom', 'timestamp', 'predicted_attack', 'is_anomaly',
+              postgresql_include=['confidence', 'anomaly_score']),
         Index('idx_src_dst', 'src_ip', 'dst_ip'),
         Index('idx_anomaly', 'is_anomaly', 'timestamp'),
         Index('idx_label', 'label'),
@@ -141,45 +149,60 @@ class NetworkFlow(Base):
 
     def get_features_dict(self):
         """Get the 37 features used by the retrained model as a dictionary."""
-        return {
-            'flow_duration': self.flow_duration,
-            'Header_Length': self.Header_Length,
-            'Protocol Type': self.Protocol_Type,
-            'Duration': self.Duration,
-            'Rate': self.Rate,
-            'Drate': self.Drate,
-            'fin_flag_number': self.fin_flag_number,
-            'syn_flag_number': self.syn_flag_number,
-            'psh_flag_number': self.psh_flag_number,
-            'ack_flag_number': self.ack_flag_number,
-            'ece_flag_number': self.ece_flag_number,
-            'cwr_flag_number': self.cwr_flag_number,
-            'syn_count': self.syn_count,
-            'fin_count': self.fin_count,
-            'urg_count': self.urg_count,
-            'rst_count': self.rst_count,
-            'HTTP': self.HTTP,
-            'HTTPS': self.HTTPS,
-            'DNS': self.DNS,
-            'Telnet': self.Telnet,
-            'SMTP': self.SMTP,
-            'SSH': self.SSH,
-            'IRC': self.IRC,
-            'TCP': self.TCP,
-            'UDP': self.UDP,
-            'DHCP': self.DHCP,
-            'ARP': self.ARP,
-            'ICMP': self.ICMP,
-            'IPv': self.IPv,
-            'Tot sum': self.Tot_sum,
-            'Min': self.Min,
-            'Max': self.Max,
-            'AVG': self.AVG,
-            'Tot size': self.Tot_size,
-            'IAT': self.IAT,
-            'Covariance': self.Covariance,
-            'Variance': self.Variance,
-        }
+        return {feature: getattr(self, column) for feature, column in MODEL_FEATURE_COLUMNS}
+
+
+# The 37 features used by the retrained model: (feature name, NetworkFlow column)
+MODEL_FEATURE_COLUMNS = [
+    ('flow_duration', 'flow_duration'),
+    ('Header_Length', 'Header_Length'),
+    ('Protocol Type', 'Protocol_Type'),
+    ('Duration', 'Duration'),
+    ('Rate', 'Rate'),
+    ('Drate', 'Drate'),
+    ('fin_flag_number', 'fin_flag_number'),
+    ('syn_flag_number', 'syn_flag_number'),
+    ('psh_flag_number', 'psh_flag_number'),
+    ('ack_flag_number', 'ack_flag_number'),
+    ('ece_flag_number', 'ece_flag_number'),
+    ('cwr_flag_number', 'cwr_flag_number'),
+    ('syn_count', 'syn_count'),
+    ('fin_count', 'fin_count'),
+    ('urg_count', 'urg_count'),
+    ('rst_count', 'rst_count'),
+    ('HTTP', 'HTTP'),
+    ('HTTPS', 'HTTPS'),
+    ('DNS', 'DNS'),
+    ('Telnet', 'Telnet'),
+    ('SMTP', 'SMTP'),
+    ('SSH', 'SSH'),
+    ('IRC', 'IRC'),
+    ('TCP', 'TCP'),
+    ('UDP', 'UDP'),
+    ('DHCP', 'DHCP'),
+    ('ARP', 'ARP'),
+    ('ICMP', 'ICMP'),
+    ('IPv', 'IPv'),
+    ('Tot sum', 'Tot_sum'),
+    ('Min', 'Min'),
+    ('Max', 'Max'),
+    ('AVG', 'AVG'),
+    ('Tot size', 'Tot_size'),
+    ('IAT', 'IAT'),
+    ('Covariance', 'Covariance'),
+    ('Variance', 'Variance'),
+]
+
+
+# Read-only per-minute flow counts by attack type over the last 24 hours.
+# On PostgreSQL this is a materialized view that DatabaseManager creates and
+# refreshes, so it is kept out of Base.metadata and create_all.
+AttackSummary = Table(
+    'mv_recent_attacks', MetaData(),
+    Column('bucket', DateTime, primary_key=True),
+    Column('predicted_attack', String(100), primary_key=True),
+    Column('flow_count', Integer),
+)
 
 
 class ModelTrainingMetadata(Base):
@@ -0,0 +1,129 @@
+"""
+Columnar Parquet Sink for Network Flows
+
+Keeps a day-partitioned Parquet copy of every saved flow for historical
+analysis and retraining, so exports read only the columns they need instead
+of scanning full database rows. The database keeps serving recent flows.
+
+Layout: <root>/date=YYYY-MM-DD/part-*.parquet (hive partitioning)
+"""
+
+import logging
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text
+
+from src.database.models import NetworkFlow
+
+logger = logging.getLogger(__name__)
+
+# Flows buffered in memory before a partition file is written
+SINK_BATCH_SIZE = 50000
+
+
+def flow_schema():
+    """Arrow schema of the network_flows columns (without the id)."""
+    types = [
+        (Boolean, pa.bool_()),
+        (DateTime, pa.timestamp('us')),
+        (Float, pa.float32()),
+        (Integer, pa.int32()),
+        (String, pa.string()),
+        (Text, pa.string()),
+    ]
+    fields = []
+    for column in NetworkFlow.__table__.columns:
+        if column.name == 'id':
+            continue
+        arrow_type = next(t for sql_type, t in types if isinstance(column.type, sql_type))
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+class ParquetFlowSink:
+    """
+    Buffers flow rows (network_flows column dicts) and writes them to
+    day-partitioned, compressed Parquet files.
+    """
+
+    def __init__(self, root_dir: str, batch_size: int = SINK_BATCH_SIZE,
+                 compression: str = 'snappy'):
+        if pa is None:
+            raise ImportError("pyarrow is required for the Parquet flow sink")
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.compression = compression
+        self.schema = flow_schema()
+        self.file_format = ds.ParquetFileFormat()
+        self.write_options = self.file_format.make_write_options(compression=compression)
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def append(self, rows: List[Dict]):
+        """Buffer flow rows, writing them out once batch_size are pending."""
+        with self._lock:
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered flows to their day partitions. Returns the number written."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+
+        # One typed array per column, then a date column to partition on
+        table = pa.Table.from_arrays(
+            [pa.array([row.get(field.name) for row in rows], type=field.type)
+             for field in self.schema],
+            schema=self.schema
+        )
+        dates = pa.array([row['timestamp'].strftime('%Y-%m-%d') for row in rows])
+        table = table.append_column('date', dates)
+
+        ds.write_dataset(
+            table, self.root_dir, format=self.file_format, file_options=self.write_options,
+            partitioning=['date'], partitioning_flavor='hive',
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        logger.debug(f"Wrote {len(rows)} flows to {self.root_dir}")
+        return len(rows)
+
+    def dataset(self):
+        """pyarrow dataset over every partition, for column-pruned reads."""
+        return ds.dataset(self.root_dir, format='parquet', partitioning='hive')
+
+    def compact(self, date: str) -> int:
+        """
+        Rewrite one day partition (YYYY-MM-DD) as a single file.
+        Returns the number of flows in it.
+        """
+        partition = self.root_dir / f"date={date}"
+        parts = sorted(partition.glob('*.parquet'))
+        if len(parts) <= 1:
+            return pq.ParquetFile(parts[0]).metadata.num_rows if parts else 0
+
+        # Written under a dot name (ignored by dataset readers) and renamed in
+        # after the old parts are gone, so no flow is ever read twice; parts
+        # flushed meanwhile aren't in parts and are kept
+        table = ds.dataset(parts, format='parquet').to_table()
+        name = f"part-{uuid.uuid4().hex}-0.parquet"
+        pq.write_table(table, partition / f".{name}", compression=self.compression)
+        for part in parts:
+            part.unlink()
+        (partition / f".{name}").rename(partition / name)
+        return table.num_rows
@@ -32,8 +32,9 @@ function Alerts() {
     try {
       const ws = new WebSocket('ws://localhost:8000/ws/alerts');
       ws.onmessage = (event) => {
-        const alert = JSON.parse(event.data);
-        setAlerts(prev => [alert, ...prev].slice(0, 50)); // Keep last 50
+        // Alerts arrive in batches, oldest first
+        const batch = JSON.parse(event.data);
+        setAlerts(prev => [...batch.reverse(), ...prev].slice(0, 50)); // Keep last 50
       };
       return () => ws.close();
     } catch (err) {
@@ -18,8 +18,19 @@ function Flows() {
         };
 
         ws.onmessage = (event) => {
-          const data = JSON.parse(event.data);
-          setFlows(data);
+          // Server sends {added, updated, removed} relative to its last message;
+          // reset marks a full snapshot that replaces the current list
+          const diff = JSON.parse(event.data);
+          setFlows((prev) => {
+            const byKey = new Map(diff.reset ? [] : prev.map((flow) => [JSON.stringify(flow.key), flow]));
+            for (const flow of [...diff.added, ...diff.updated]) {
+              byKey.set(JSON.stringify(flow.key), flow);
+            }
+            for (const key of diff.removed) {
+              byKey.delete(JSON.stringify(key));
+            }
+            return Array.from(byKey.values());
+          });
         };
 
         ws.onerror = (err) => {
@@ -10,7 +10,10 @@ This module identifies IoT devices on the network by analyzing:
 
 import re
 import socket
-from collections import defaultdict
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Known IoT device manufacturers by MAC OUI (first 3 bytes)
@@ -39,7 +42,7 @@ IOT_DEVICE_OUIS = {
     '00:62:6E': 'Wyze Cam',
     'D0:73:D5': 'Ring Camera',
     '00:12:FB': 'Nest Cam',
-    '18:B4:30': 'Nest Cam',
+    '18:B4:30': 'Nest Cam/Thermostat',
     'B4:5D:50': 'Arlo Camera',
 
     # Smart Lights/Hue
@@ -47,7 +50,6 @@ IOT_DEVICE_OUIS = {
     'EC:B5:FA': 'Philips Hue',
 
     # Smart Thermostats
-    '18:B4:30': 'Nest Thermostat',
     '64:16:66': 'Nest Thermostat',
 
     # Smart Plugs
@@ -72,6 +74,12 @@ IOT_DEVICE_OUIS = {
     'B8:E9:37': 'Sonos Speaker',
 }
 
+# The same table keyed by the OUI as a 24-bit integer
+_OUI_MANUFACTURERS = {int(oui.replace(':', ''), 16): name for oui, name in IOT_DEVICE_OUIS.items()}
+
+# Resolved (or failed) reverse DNS lookups kept per detector
+HOSTNAME_CACHE_SIZE = 4096
+
 # Common IoT device behaviors
 IOT_PORT_PATTERNS = {
     'mqtt': [1883, 8883],  # MQTT (IoT messaging)
@@ -102,41 +110,62 @@ class IoTDeviceDetector:
     def __init__(self):
         self.devices = {}  # {mac_address: device_info}
         self.ip_to_mac = {}  # {ip_address: mac_address}
-        self.hostname_cache = {}  # {ip_address: hostname}
+        self.hostname_cache = OrderedDict()  # {ip_address: hostname}, LRU-bounded
+        self._hostname_lock = threading.Lock()
+        self._pending_lookups = set()  # IPs with a reverse DNS lookup in flight
+        self._resolver = ThreadPoolExecutor(max_workers=4, thread_name_prefix='rdns')
+        self._json_cache = {}  # {mac_address: JSON-ready device profile}
+        self._dirty = set()  # MACs whose cached profile is stale
 
     def get_hostname(self, ip_address):
         """
-        Resolve hostname for an IP address using reverse DNS.
+        Resolve hostname for an IP address using reverse DNS, without blocking.
+
+        A cache miss schedules the lookup on a background thread and returns
+        None; once it completes, the result is cached and the device with
+        that IP gets its hostname and friendly name updated.
 
         Args:
             ip_address: IP address to resolve
 
         Returns:
-            str: Hostname or None if resolution fails
+            str: Hostname, or None if unknown, pending or resolution failed
         """
-        # Check cache first
-        if ip_address in self.hostname_cache:
-            return self.hostname_cache[ip_address]
+        with self._hostname_lock:
+            if ip_address in self.hostname_cache:
+                self.hostname_cache.move_to_end(ip_address)
+                return self.hostname_cache[ip_address]
+            if ip_address in self._pending_lookups:
+                return None
+            self._pending_lookups.add(ip_address)
+        self._resolver.submit(self._resolve_hostname, ip_address)
+        return None
 
+    def _resolve_hostname(self, ip_address):
         try:
-            # Try reverse DNS lookup (with short timeout)
+            # Try reverse DNS lookup
             hostname = socket.gethostbyaddr(ip_address)[0]
 
             # Clean up the hostname (remove domain suffix for readability)
-            if '.' in hostname:
-                # Keep only the first part (e.g., "johns-iphone" from "johns-iphone.local")
-                clean_name = hostname.split('.')[0]
-            else:
-                clean_name = hostname
+            # Keep only the first part (e.g., "johns-iphone" from "johns-iphone.local")
+            clean_name = hostname.split('.')[0]
+        except (socket.herror, socket.gaierror, socket.timeout, OSError):
+            # DNS lookup failed - cache None to avoid repeated lookups
+            clean_name = None
 
-            # Cache it
+        with self._hostname_lock:
             self.hostname_cache[ip_address] = clean_name
-            return clean_name
+            if len(self.hostname_cache) > HOSTNAME_CACHE_SIZE:
+                self.hostname_cache.popitem(last=False)
+            self._pending_lookups.discard(ip_address)
 
-        except (socket.herror, socket.gaierror, socket.timeout, OSError):
-            # DNS lookup failed - cache None to avoid repeated lookups
-            self.hostname_cache[ip_address] = None
-            return None
+        # Fill in the device registered while the lookup was pending
+        mac_address = self.ip_to_mac.get(ip_address)
+        device = self.devices.get(mac_address)
+        if clean_name and device is not None and not device.get('hostname'):
+            device['hostname'] = clean_name
+            device['friendly_name'] = self.generate_friendly_name(device)
+            self._dirty.add(mac_address)
 
     def generate_friendly_name(self, device_profile):
         """
@@ -180,17 +209,18 @@ class IoTDeviceDetector:
         if not mac_address or mac_address == 'N/A':
             return None
 
-        # Normalize MAC address
-        mac_upper = mac_address.upper()
-
-        # Extract OUI (first 3 bytes)
-        oui = ':'.join(mac_upper.split(':')[:3])
+        # OUI (first 3 bytes) as a 24-bit integer, read straight from the hex digits
+        try:
+            oui_value = int(mac_address[0:2] + mac_address[3:5] + mac_address[6:8], 16)
+        except ValueError:
+            return None
 
-        if oui in IOT_DEVICE_OUIS:
+        manufacturer = _OUI_MANUFACTURERS.get(oui_value)
+        if manufacturer is not None:
             return {
                 'type': 'iot',
-                'manufacturer': IOT_DEVICE_OUIS[oui],
-                'oui': oui,
+                'manufacturer': manufacturer,
+                'oui': mac_address[:8].upper(),
                 'confidence': 'high',
                 'method': 'mac_fingerprint'
             }
@@ -230,7 +260,7 @@ class IoTDeviceDetector:
 
         return None
 
-    def register_device(self, ip_address, mac_address=None, packet_info=None):
+    def register_device(self, ip_address, mac_address=None, packet_info=None, now_ts=None):
         """
         Register or update a device in the detection system.
 
@@ -238,6 +268,7 @@ class IoTDeviceDetector:
             ip_address: Device IP address
             mac_address: Device MAC address (if available)
             packet_info: Additional packet information
+            now_ts: Packet time as an epoch float (default: time.time())
 
         Returns:
             Device profile dict
@@ -246,11 +277,15 @@ class IoTDeviceDetector:
         if ip_address in ('127.0.0.1', '::1'):
             return None
 
+        if now_ts is None:
+            now_ts = time.time()
+
         # Check if device already profiled
-        if mac_address and mac_address in self.devices:
-            device = self.devices[mac_address]
-            device['last_seen'] = datetime.now()
+        device = self.devices.get(mac_address) if mac_address else None
+        if device is not None:
+            device['last_seen'] = now_ts
             device['packet_count'] = device.get('packet_count', 0) + 1
+            self._dirty.add(mac_address)
             return device
 
         # Try to resolve hostname
@@ -261,8 +296,9 @@ class IoTDeviceDetector:
             'ip_address': ip_address,
             'mac_address': mac_address,
             'hostname': hostname,
-            'first_seen': datetime.now(),
-            'last_seen': datetime.now(),
+            # Epoch floats; turned into datetimes only when read out
+            'first_seen': now_ts,
+            'last_seen': now_ts,
             'packet_count': 1,
             'is_iot': False,
             'device_type': 'unknown',
@@ -287,6 +323,7 @@ class IoTDeviceDetector:
         if mac_address:
             self.devices[mac_address] = device_profile
             self.ip_to_mac[ip_address] = mac_address
+            self._dirty.add(mac_address)
 
         return device_profile
 
@@ -300,9 +337,10 @@ class IoTDeviceDetector:
             protocol: Protocol name
         """
         mac_address = self.ip_to_mac.get(ip_address)
+        device = self.devices.get(mac_address) if mac_address else None
 
-        if mac_address and mac_address in self.devices:
-            device = self.devices[mac_address]
+        if device is not None:
+            self._dirty.add(mac_address)
 
             if port:
                 device['ports_used'].add(port)
@@ -333,16 +371,15 @@ class IoTDeviceDetector:
             mac_address: Device MAC
 
         Returns:
-            Device profile dict or None
+            Copy of the device profile dict or None
         """
-        if mac_address and mac_address in self.devices:
-            return self.devices[mac_address]
+        device = self.devices.get(mac_address) if mac_address else None
+        if device is None and ip_address and ip_address in self.ip_to_mac:
+            device = self.devices.get(self.ip_to_mac[ip_address])
 
-        if ip_address and ip_address in self.ip_to_mac:
-            mac = self.ip_to_mac[ip_address]
-            return self.devices.get(mac)
-
-        return None
+        if device is None:
+            return None
+        return self._datetimes(device.copy())
 
     def get_all_devices(self):
         """
@@ -360,9 +397,62 @@ class IoTDeviceDetector:
                 device_copy['ports_used'] = list(device_copy['ports_used'])
             if 'protocols_seen' in device_copy and isinstance(device_copy['protocols_seen'], set):
                 device_copy['protocols_seen'] = list(device_copy['protocols_seen'])
+            self._datetimes(device_copy)
             devices_list.append(device_copy)
         return devices_list
 
+    @staticmethod
+    def _datetimes(device_copy):
+        """Turn the epoch first/last seen times of a profile copy into datetimes."""
+        for field in ('first_seen', 'last_seen'):
+            if isinstance(device_copy.get(field), float):
+                device_copy[field] = datetime.fromtimestamp(device_copy[field])
+        return device_copy
+
+    @staticmethod
+    def _serialize_device(device):
+        """Copy a device profile with sets and datetimes in JSON form."""
+        device_json = device.copy()
+        for field in ('ports_used', 'protocols_seen'):
+            if field in device_json:
+                device_json[field] = sorted(device_json[field])
+        for field in ('first_seen', 'last_seen'):
+            if isinstance(device_json.get(field), float):
+                device_json[field] = datetime.fromtimestamp(device_json[field]).isoformat()
+        return device_json
+
+    def _refresh_json_cache(self):
+        """Re-serialize only the devices updated since the last read."""
+        while self._dirty:
+            mac = self._dirty.pop()
+            device = self.devices.get(mac)
+            if device is not None:
+                self._json_cache[mac] = self._serialize_device(device)
+
+    def get_all_devices_json(self):
+        """
+        Get all detected devices in JSON-ready form.
+
+        Returns:
+            List of cached device profiles (do not modify)
+        """
+        self._refresh_json_cache()
+        return list(self._json_cache.values())
+
+    def get_device_json(self, ip_address=None, mac_address=None):
+        """
+        Get a single device in JSON-ready form by IP or MAC.
+
+        Returns:
+            Cached device profile (do not modify) or None
+        """
+        if not mac_address and ip_address:
+            mac_address = self.ip_to_mac.get(ip_address)
+        if not mac_address or mac_address not in self.devices:
+            return None
+        self._refresh_json_cache()
+        return self._json_cache.get(mac_address)
+
     def get_all_iot_devices(self):
         """
         Get all detected IoT devices.
@@ -370,8 +460,16 @@ class IoTDeviceDetector:
         Returns:
             List of IoT device profiles
         """
-        all_devices = self.get_all_devices()
-        return [device for device in all_devices if device.get('is_iot', False)]
+        iot_devices = []
+        for device in self.devices.values():
+            if not device.get('is_iot', False):
+                continue
+            device_copy = device.copy()
+            for field in ('ports_used', 'protocols_seen'):
+                if isinstance(device_copy.get(field), set):
+                    device_copy[field] = list(device_copy[field])
+            iot_devices.append(self._datetimes(device_copy))
+        return iot_devices
 
     def get_device_summary(self):
         """
@@ -380,15 +478,27 @@ class IoTDeviceDetector:
         Returns:
             dict with summary stats
         """
-        iot_devices = self.get_all_iot_devices()
+        # Single pass over the live profiles; no copies are needed just to count
+        iot_count = high_confidence = medium_confidence = 0
+        device_types = set()
+        for device in self.devices.values():
+            if not device.get('is_iot', False):
+                continue
+            iot_count += 1
+            confidence = device.get('confidence')
+            if confidence == 'high':
+                high_confidence += 1
+            elif confidence == 'medium':
+                medium_confidence += 1
+            device_types.add(device.get('device_type'))
 
         return {
             'total_devices': len(self.devices),
-            'iot_devices': len(iot_devices),
-            'non_iot_devices': len(self.devices) - len(iot_devices),
-            'high_confidence': sum(1 for d in iot_devices if d.get('confidence') == 'high'),
-            'medium_confidence': sum(1 for d in iot_devices if d.get('confidence') == 'medium'),
-            'device_types': list(set(d.get('device_type') for d in iot_devices)),
+            'iot_devices': iot_count,
+            'non_iot_devices': len(self.devices) - iot_count,
+            'high_confidence': high_confidence,
+            'medium_confidence': medium_confidence,
+            'device_types': list(device_types),
         }
 
     def is_iot_device(self, ip_address=None, mac_address=None):
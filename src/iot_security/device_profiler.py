@@ -1,26 +1,56 @@
-from collections import defaultdict
 import time
 
+import numpy as np
+
+# Packets per second above which a device's traffic is flagged
+RATE_THRESHOLD = 100
+
+
 class DeviceProfiler:
-    def __init__(self):
-        self.profiles = defaultdict(lambda: {
-            'packet_count': 0,
-            'byte_count': 0,
-            'start_time': None,
-            'last_time': None
-            })
-        
+    """
+    Per-device packet/byte counters kept as parallel NumPy arrays
+    (one row per device), so all devices can be scored in one vectorized pass.
+    """
+
+    def __init__(self, capacity=4096):
+        self._index = {}  # {device_id: row}
+        self.packet_count = np.zeros(capacity, dtype=np.int64)
+        self.byte_count = np.zeros(capacity, dtype=np.int64)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.last_time = np.zeros(capacity, dtype=np.float64)
+
+    def _grow(self):
+        capacity = 2 * len(self.packet_count)
+        for name in ('packet_count', 'byte_count', 'start_time', 'last_time'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
     def profile_device(self, device_id, packet_size):
-        profile = self.profiles[device_id]
-        profile['packet_count'] += 1
-        profile['byte_count'] += packet_size
         current_time = time.time()
-        if not profile['start_time']:
-            profile['start_time'] = current_time
-        profile['last_time'] = current_time
+        i = self._index.get(device_id)
+        if i is None:
+            i = len(self._index)
+            if i == len(self.packet_count):
+                self._grow()
+            self._index[device_id] = i
+            self.start_time[i] = current_time
+        self.packet_count[i] += 1
+        self.byte_count[i] += packet_size
+        self.last_time[i] = current_time
 
         # check for anomalies (e.g unusual traffic volume)
-        duration = profile['last_time'] - profile['start_time']
-        if duration > 0 and profile['packet_count'] / duration > 100:  # more than 100 packets/sec
+        duration = current_time - self.start_time[i]
+        if duration > 0 and self.packet_count[i] / duration > RATE_THRESHOLD:  # more than 100 packets/sec
             return 'Suspicious activity detected'
         return 'Normal'
+
+    def suspicious_devices(self, threshold=RATE_THRESHOLD):
+        """Device ids whose average packet rate exceeds threshold packets/sec."""
+        n = len(self._index)
+        duration = self.last_time[:n] - self.start_time[:n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(duration > 0, self.packet_count[:n] / duration, 0.0)
+        ids = list(self._index)
+        return [ids[i] for i in np.flatnonzero(rate > threshold)]
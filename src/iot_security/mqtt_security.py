@@ -1,8 +1,15 @@
 import paho.mqtt.client as mqtt
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Keywords that suggest credentials in a payload
+SENSITIVE_KEYWORDS = (b'password', b'key', b'token', b'secret')
+
+# One case-insensitive pass over the raw payload for all keywords
+_SENSITIVE_RE = re.compile(b'|'.join(map(re.escape, SENSITIVE_KEYWORDS)), re.IGNORECASE)
+
 class MQTTSecurity:
     def __init__(self, broker='localhost', port=1883):
         self.broker = broker
@@ -23,7 +30,7 @@ class MQTTSecurity:
         # Basic security checks
         if len(payload) > 1024:  # Large payload
             logger.warning(f"Large payload on topic {topic}")
-        if b'password' in payload.lower() or b'key' in payload.lower():
+        if _SENSITIVE_RE.search(payload):
             logger.warning(f"Sensitive data detected on topic {topic}")
         # Add more checks as needed
 
@@ -0,0 +1,109 @@
+"""
+Micro-batching of threat predictions for concurrent async callers.
+"""
+import asyncio
+import logging
+
+import numpy as np
+
+from src.models.predict import _validate_features, predict_threat_batch
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """
+    Collects single-flow prediction requests and runs them as one batch.
+
+    The first waiting request opens a window of max_latency seconds; every
+    request that arrives within it (up to max_batch_size) is scored by a single
+    predict_threat_batch call in a worker thread.
+    """
+
+    def __init__(self, max_batch_size=32, max_latency=0.01, use_ensemble=True):
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.use_ensemble = use_ensemble
+        self.queue = None
+        self._task = None
+        self._in_flight = []  # (row, future) pairs taken off the queue, not yet answered
+
+    def start(self):
+        """Start the batching loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self.queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching loop and cancel every request it hasn't answered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending, self._in_flight = self._in_flight, []
+        while self.queue is not None and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.cancel()
+
+    async def predict(self, features):
+        """
+        Predict a single flow.
+
+        Args:
+            features: One-row DataFrame or 1D feature array
+
+        Returns:
+            dict in the same format as predict_threat
+        """
+        self.start()
+        row = _validate_features(features)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        """Wait for one request, then gather more until the window closes or the batch is full."""
+        loop = asyncio.get_running_loop()
+        batch = self._in_flight = [await self.queue.get()]
+        deadline = loop.time() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            rows, futures = zip(*batch)
+            try:
+                results = await asyncio.to_thread(
+                    predict_threat_batch, np.vstack(rows), self.use_ensemble
+                )
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future, result in zip(futures, results):
+                    if not future.done():
+                        future.set_result(result)
+            self._in_flight = []
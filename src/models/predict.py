@@ -17,6 +17,7 @@ from tensorflow.keras import backend as K
 
 # Import custom losses if required for model loading
 from src.models.custom_losses import focal_loss_fixed, focal_loss
+from src.data_processing.feature_engineer import load_feature_info as _load_feature_info_cached
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -29,10 +30,8 @@ FEATURE_INFO_PATH = RETRAINED_DIR / 'feature_info.json'
 def load_feature_info():
     """Loads feature names and count from the JSON file."""
     try:
-        with open(FEATURE_INFO_PATH, 'r') as f:
-            feature_info = json.load(f)
-        feature_names = feature_info.get("feature_names", [])
-        n_features = feature_info.get("n_features", len(feature_names))
+        feature_names, n_features = _load_feature_info_cached(FEATURE_INFO_PATH)
+        feature_names = list(feature_names)
         
         if n_features != len(feature_names):
             raise ValueError("Mismatch between 'n_features' and the actual number of feature names.")
@@ -122,9 +121,7 @@ def runtime_sanity_check(verbose: bool = True) -> bool:
         # Load model feature info if available
         model_feats = []
         if FEATURE_INFO_PATH.exists():
-            with open(FEATURE_INFO_PATH, 'r') as f:
-                fi = json.load(f)
-                model_feats = fi.get('feature_names', [])
+            model_feats = list(_load_feature_info_cached(FEATURE_INFO_PATH)[0])
 
         if model_feats and fe_names and model_feats != fe_names:
             issues.append("Feature name/order mismatch between feature_info.json and feature_engineer.get_feature_names()")
@@ -145,11 +142,15 @@ def runtime_sanity_check(verbose: bool = True) -> bool:
 
 
 def _scale_and_clip(X_df):
-    """Scale DataFrame with the configured scaler and apply clipping to z-scores.
+    """Scale features (DataFrame or array) with the configured scaler and apply clipping to z-scores.
 
     Returns a numpy array (scaled). Raises if scaler cannot be loaded.
     """
     scaler = get_cached_model('scaler', lambda: joblib.load(SCALER_PATH))
+    if isinstance(X_df, np.ndarray) and hasattr(scaler, 'feature_names_in_'):
+        # Arrays are in MODEL_FEATURE_NAMES order (see _validate_features); name
+        # the columns so the scaler can check them against its fitted names
+        X_df = pd.DataFrame(X_df, columns=MODEL_FEATURE_NAMES, copy=False)
     X_scaled = scaler.transform(X_df)
     if CLIP_ENABLED:
         # Count clipped entries for logging
@@ -195,6 +196,26 @@ def eager_load_models(verbose: bool = True) -> bool:
     return success
 
 
+def warm_up_models(verbose: bool = True) -> bool:
+    """
+    Load models and run one dummy batch through the ensemble so the first
+    real prediction does not pay for graph tracing and lazy initialisation.
+    """
+    if not eager_load_models(verbose=verbose):
+        return False
+    try:
+        dummy = np.zeros((1, EXPECTED_FEATURES), dtype=np.float32)
+        result = predict_threat_batch(dummy)[0]
+        if result.get('method') == 'error':
+            raise RuntimeError(result.get('error'))
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+        return False
+    if verbose:
+        logger.info("Model warm-up prediction completed")
+    return True
+
+
 if __name__ == '__main__':
     import argparse
 
@@ -254,11 +275,13 @@ def _validate_features(features, return_dataframe=False):
             # Fallback: use whatever features are available
             X_df = features
     else:
+        # Arrays are taken to be in MODEL_FEATURE_NAMES order already
         X = np.asarray(features)
         if X.ndim == 1:
             X = X.reshape(1, -1)
-        # Convert to DataFrame with feature names
-        X_df = pd.DataFrame(X, columns=MODEL_FEATURE_NAMES)
+        if X.shape[1] != EXPECTED_FEATURES:
+            raise ValueError(f"Expected {EXPECTED_FEATURES} features, got {X.shape[1]}")
+        return pd.DataFrame(X, columns=MODEL_FEATURE_NAMES) if return_dataframe else X
 
     if X_df.shape[1] != EXPECTED_FEATURES:
         raise ValueError(f"Expected {EXPECTED_FEATURES} features, got {X_df.shape[1]}")
@@ -285,6 +308,20 @@ def detect_anomaly(features):
 
 
 
+def _severity_for_label(label):
+    """Determine severity based on attack type."""
+    if label == 'BenignTraffic':
+        return 'low'
+    elif any(x in label for x in ['DDoS', 'DoS', 'Flood']):
+        return 'medium'
+    elif any(x in label for x in ['Backdoor', 'Malware', 'Injection', 'Mirai']):
+        return 'high'
+    elif any(x in label for x in ['Recon', 'Scan', 'Discovery']):
+        return 'medium'
+    return 'high'
+
+
+
 # Machine Learning Classifier (Random Forest)
 
 def classify_ml(features):
@@ -293,8 +330,7 @@ def classify_ml(features):
         model = get_cached_model('rf_model', lambda: joblib.load(RF_MODEL_PATH))
         class_mapping = get_cached_model('class_mapping', load_class_mapping)
 
-        X_df = _validate_features(features, return_dataframe=True)
-        X_scaled = _scale_and_clip(X_df)
+        X_scaled = _scale_and_clip(_validate_features(features))
 
         # Get predictions
         preds = model.predict(X_scaled)
@@ -306,17 +342,7 @@ def classify_ml(features):
         # Decode label using class mapping
         label = class_mapping.get(class_index, 'Unknown')
 
-        # Determine severity based on attack type
-        if label == 'BenignTraffic':
-            severity = 'low'
-        elif any(x in label for x in ['DDoS', 'DoS', 'Flood']):
-            severity = 'medium'
-        elif any(x in label for x in ['Backdoor', 'Malware', 'Injection', 'Mirai']):
-            severity = 'high'
-        elif any(x in label for x in ['Recon', 'Scan', 'Discovery']):
-            severity = 'medium'
-        else:
-            severity = 'high'
+        severity = _severity_for_label(label)
 
         return label, severity, confidence
 
@@ -337,8 +363,7 @@ def classify_dl(features):
         }))
         class_mapping = get_cached_model('class_mapping', load_class_mapping)
 
-        X_df = _validate_features(features, return_dataframe=True)
-        X_scaled = _scale_and_clip(X_df)
+        X_scaled = _scale_and_clip(_validate_features(features))
 
         # Get predictions
         predictions = model.predict(X_scaled, verbose=0)
@@ -348,17 +373,7 @@ def classify_dl(features):
         # Decode label using class mapping
         label = class_mapping.get(class_index, 'Unknown')
 
-        # Determine severity based on attack type
-        if label == 'BenignTraffic':
-            severity = 'low'
-        elif any(x in label for x in ['DDoS', 'DoS', 'Flood']):
-            severity = 'medium'
-        elif any(x in label for x in ['Backdoor', 'Malware', 'Injection', 'Mirai']):
-            severity = 'high'
-        elif any(x in label for x in ['Recon', 'Scan', 'Discovery']):
-            severity = 'medium'
-        else:
-            severity = 'high'
+        severity = _severity_for_label(label)
 
         return label, severity, confidence
 
@@ -374,7 +389,11 @@ def combine_predictions(features):
     """
     rf_label, rf_sev, rf_conf = classify_ml(features)
     dl_label, dl_sev, dl_conf = classify_dl(features)
+    return _ensemble_decision(rf_label, rf_sev, rf_conf, dl_label, dl_sev, dl_conf)
+
 
+def _ensemble_decision(rf_label, rf_sev, rf_conf, dl_label, dl_sev, dl_conf):
+    """Weighted RF/DL vote for one flow, shared by the single and batch paths."""
     rf_weight = ENSEMBLE_WEIGHTS['random_forest']
     dl_weight = ENSEMBLE_WEIGHTS['deep_learning']
 
@@ -403,6 +422,7 @@ def combine_predictions(features):
         'attack': final_label,
         'severity': final_sev,
         'confidence': float(final_conf),
+        'weighted_confidence': float(weighted_conf),
         'method': method,
         'models': {
             'ml': {'attack': rf_label, 'severity': rf_sev, 'confidence': rf_conf},
@@ -442,18 +462,91 @@ def predict_threat(features, use_ensemble=True):
 
     except Exception as e:
         logger.error(f"Threat prediction failed: {e}")
-        return {
-            'attack': 'BenignTraffic',
-            'severity': 'unknown',
-            'confidence': 0.0,
-            'method': 'error',
-            'error': str(e),
-            'anomaly': {'is_anomaly': False, 'confidence': 0.0},
+        return _prediction_error(e)
+
+
+def _prediction_error(error):
+    """Fallback prediction returned when inference fails."""
+    return {
+        'attack': 'BenignTraffic',
+        'severity': 'unknown',
+        'confidence': 0.0,
+        'method': 'error',
+        'error': str(error),
+        'anomaly': {'is_anomaly': False, 'confidence': 0.0},
+        'models': {
+            'ml': {'attack': 'BenignTraffic', 'severity': 'low', 'confidence': 0.0},
+            'dl': {'attack': 'BenignTraffic', 'severity': 'low', 'confidence': 0.0}
+        }
+    }
+
+
+def _classify_batch(model_key, X_scaled):
+    """Label/severity/confidence for every row of X_scaled with a single model call."""
+    n_rows = X_scaled.shape[0]
+    try:
+        class_mapping = get_cached_model('class_mapping', load_class_mapping)
+        if model_key == 'rf_model':
+            model = get_cached_model('rf_model', lambda: joblib.load(RF_MODEL_PATH))
+            proba = model.predict_proba(X_scaled)
+            class_indices = model.classes_[np.argmax(proba, axis=1)]
+        else:
+            model = get_cached_model('dl_model', lambda: load_model(DL_MODEL_PATH, custom_objects={
+                'focal_loss_fixed': focal_loss_fixed,
+                'focal_loss': focal_loss
+            }))
+            proba = model.predict(X_scaled, verbose=0)
+            class_indices = np.argmax(proba, axis=1)
+        confidences = np.max(proba, axis=1)
+
+        results = []
+        for class_index, confidence in zip(class_indices.tolist(), confidences.tolist()):
+            label = class_mapping.get(class_index, 'Unknown')
+            results.append((label, _severity_for_label(label), float(confidence)))
+        return results
+
+    except Exception as e:
+        logger.error(f"Batch classification with {model_key} failed: {e}")
+        return [('BenignTraffic', 'low', 0.0)] * n_rows
+
+
+def predict_threat_batch(features, use_ensemble=True):
+    """
+    Predict threats for many flows at once.
+
+    Scales the whole batch once and calls each model once over all rows instead
+    of once per flow. Accepts a multi-row DataFrame or 2D array and returns a
+    list of dicts in the same format as predict_threat, one per row.
+    """
+    try:
+        X_scaled = _scale_and_clip(_validate_features(features))
+    except Exception as e:
+        logger.error(f"Batch threat prediction failed: {e}")
+        n_rows = len(features)
+        return [_prediction_error(e) for _ in range(n_rows)]
+
+    anomaly_info = detect_anomaly(features)
+    rf_results = _classify_batch('rf_model', X_scaled)
+
+    if not use_ensemble:
+        return [{
+            'attack': rf_label,
+            'severity': rf_sev,
+            'confidence': float(rf_conf),
+            'method': 'random_forest_only',
+            'threshold': OPTIMAL_THRESHOLD,
+            'anomaly': anomaly_info,
             'models': {
-                'ml': {'attack': 'BenignTraffic', 'severity': 'low', 'confidence': 0.0},
+                'ml': {'attack': rf_label, 'severity': rf_sev, 'confidence': rf_conf},
                 'dl': {'attack': 'BenignTraffic', 'severity': 'low', 'confidence': 0.0}
             }
-        }
+        } for rf_label, rf_sev, rf_conf in rf_results]
+
+    dl_results = _classify_batch('dl_model', X_scaled)
+    return [
+        {**_ensemble_decision(*rf, *dl), 'threshold': OPTIMAL_THRESHOLD, 'anomaly': anomaly_info}
+        for rf, dl in zip(rf_results, dl_results)
+    ]
 
 
 # Add diagnostic logging function
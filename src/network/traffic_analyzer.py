@@ -11,7 +11,7 @@ from scapy.all import IP, TCP, UDP, sniff
 
 
 from src.models.predict import predict_threat
-from src.data_processing.feature_engineer import engineer_features_from_flow
+from src.data_processing.feature_engineer import engineer_features_from_flow, features_to_frame
 from src.iot_security.device_profiler import DeviceProfiler
 from src.iot_security.device_detector import iot_detector
 from src.utils.notification_service import NotificationService
@@ -46,7 +46,8 @@ alert_logger.addHandler(handler)
 
 
 # === Flow tracking setup ===
-flows = defaultdict(lambda: {'packets': [], 'start_time': None, 'bytes': 0})
+flows = defaultdict(lambda: {'packets': [], 'pkt_count': 0, 'start_time': None, 'bytes': 0})
+flows_version = 0  # Bumped on every flow update so readers can skip unchanged ticks
 
 alerts = []
 profiler = DeviceProfiler()   # properly instantiated
@@ -72,17 +73,17 @@ def extract_live_features(flow):
     duration = time.time() - flow['start_time']
     pkt_count = len(flow['packets'])
 
-    # Full CICIDS-style feature engineering
-    features_df = engineer_features_from_flow(flow['packets'])
+    # Full CICIDS-style feature engineering, as a model-ready (1, n_features) array
+    features = engineer_features_from_flow(flow['packets'])
 
-    return features_df, duration, pkt_count
+    return features, duration, pkt_count
 
 
 def analyse_packet(packet):
     """Process a single packet into flows and run threat detection."""
     try:
         # Debug: Log packet capture (every 100 packets)
-        global _packet_count
+        global _packet_count, flows_version
         if '_packet_count' not in globals():
             _packet_count = 0
         _packet_count += 1
@@ -104,10 +105,13 @@ def analyse_packet(packet):
 
             flow = flows[key]
 
+            now = time.time()
             if flow['start_time'] is None:
-                flow['start_time'] = time.time()
+                flow['start_time'] = now
 
             flow['packets'].append(packet)
+            flow['pkt_count'] += 1
+            flows_version += 1
             flow['bytes'] += len(packet)
 
             profiler.profile_device(key[0], len(packet))
@@ -119,18 +123,18 @@ def analyse_packet(packet):
 
             # Register/update source device
             if mac_src:
-                iot_detector.register_device(key[0], mac_src)
+                iot_detector.register_device(key[0], mac_src, now_ts=now)
                 # Determine protocol
                 protocol = 'TCP' if TCP in packet else 'UDP' if UDP in packet else 'IP'
                 iot_detector.update_device_behavior(key[0], dport, protocol)
 
             # Register/update destination device
             if mac_dst:
-                iot_detector.register_device(key[1], mac_dst)
+                iot_detector.register_device(key[1], mac_dst, now_ts=now)
                 iot_detector.update_device_behavior(key[1], dport, None)
 
             # Analyze every 10 packets in this flow
-            if len(flow['packets']) % 10 == 0:
+            if flow['pkt_count'] % 10 == 0:
                 result = extract_live_features(flow)
                 if result is not None:
                     features, duration, pkt_count = result
@@ -142,10 +146,10 @@ def analyse_packet(packet):
 
                     # Save flow to database if configured
                     global db_manager
-                    if db_manager and not features.empty:
+                    if db_manager and features.size:
                         try:
                             db_manager.save_flow(
-                                features_df=features,
+                                features_df=features_to_frame(features),
                                 src_ip=key[0],
                                 dst_ip=key[1],
                                 protocol=key[3],
@@ -415,8 +419,9 @@ def initialize_services(config=None):
         if config.get('database', {}).get('enabled', False):
             db_url = config['database'].get('url')
             db_dir = config['database'].get('directory', 'data/flows')
+            parquet_dir = config['database'].get('parquet_directory')
             try:
-                db_manager = DatabaseManager(db_url=db_url, db_dir=db_dir)
+                db_manager = DatabaseManager(db_url=db_url, db_dir=db_dir, parquet_dir=parquet_dir)
                 print(f"[+] Database manager initialized")
             except Exception as e:
                 print(f"[!] Failed to initialize database: {e}")
@@ -430,6 +435,10 @@ def initialize_services(config=None):
             print(f"    This will automatically learn your network patterns and reduce false positives")
 
 
+# Set to make the sniffer thread exit at the next captured packet
+_stop_event = threading.Event()
+
+
 def start_analyzer(interface='eth0', config=None):
     """
     Start live packet analyzer in a background thread.
@@ -481,11 +490,22 @@ def start_analyzer(interface='eth0', config=None):
     # Initialize enhanced services
     initialize_services(config)
 
+    _stop_event.clear()
     thread = threading.Thread(
         target=sniff,
-        kwargs={'iface': interface, 'prn': analyse_packet, 'store': False},
+        kwargs={
+            'iface': interface,
+            'prn': analyse_packet,
+            'store': False,
+            'stop_filter': lambda pkt: _stop_event.is_set()
+        },
         daemon=True
     )
     thread.start()
     print(f"[+] Analyzer running on {interface}")
     return thread
+
+
+def stop_analyzer():
+    """Signal the analyzer thread to stop; it exits when the next packet arrives."""
+    _stop_event.set()
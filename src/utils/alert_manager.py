@@ -2,7 +2,8 @@ import time
 import json
 import numpy as np
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
 from threading import Lock
 
 class AlertManager:
@@ -10,6 +11,9 @@ class AlertManager:
     Manages alert acknowledgments and tracking of reviewed threats.
     """
 
+    MAX_ALERTS = 10000
+    INDEXED_FIELDS = ('severity', 'threat', 'acknowledged', 'status', 'src')
+
     @staticmethod
     def _sanitize_for_json(obj):
         """Convert numpy types to native Python types for JSON serialization."""
@@ -24,21 +28,25 @@ class AlertManager:
         else:
             return obj
 
-    def __init__(self, storage_path='logs/alert_tracking.json'):
+    def __init__(self, storage_path='logs/alert_tracking.json', max_alerts=MAX_ALERTS):
         """
         Initialize the alert manager.
 
         Args:
             storage_path: Path to store alert tracking data
+            max_alerts: Number of most recent alerts to keep
         """
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Alert tracking
-        self.alerts = []  # List of all alerts
+        self.alerts = deque(maxlen=max_alerts)  # Most recent alerts, oldest first
+        self.alerts_by_id = {}  # {alert_id: alert}
+        self.indices = {field: defaultdict(set) for field in self.INDEXED_FIELDS}  # {field: {value: alert IDs}}
         self.acknowledged_alerts = set()  # IDs of acknowledged alerts
         self.alert_counter = 0
         self.lock = Lock()
+        self.listeners = []  # Callbacks invoked with each new alert
 
         # Load existing data
         self._load_data()
@@ -49,18 +57,42 @@ class AlertManager:
             if self.storage_path.exists():
                 with open(self.storage_path, 'r') as f:
                     data = json.load(f)
-                    self.alerts = data.get('alerts', [])
-                    self.acknowledged_alerts = set(data.get('acknowledged_alerts', []))
+                    self._reset(data.get('alerts', []))
+                    self.acknowledged_alerts = set(data.get('acknowledged_alerts', [])) & self.alerts_by_id.keys()
                     self.alert_counter = data.get('alert_counter', 0)
         except Exception as e:
             print(f"[AlertManager] Failed to load data: {e}")
 
+    def _index(self, alert):
+        """Add an alert to the lookup tables."""
+        self.alerts_by_id[alert['id']] = alert
+        for field in self.INDEXED_FIELDS:
+            self.indices[field][alert.get(field)].add(alert['id'])
+
+    def _unindex(self, alert):
+        """Remove an alert from the lookup tables."""
+        self.alerts_by_id.pop(alert['id'], None)
+        for field in self.INDEXED_FIELDS:
+            ids = self.indices[field].get(alert.get(field))
+            if ids is not None:
+                ids.discard(alert['id'])
+                if not ids:
+                    del self.indices[field][alert.get(field)]
+
+    def _reset(self, alerts):
+        """Replace all tracked alerts and rebuild the lookup tables."""
+        self.alerts = deque(alerts, maxlen=self.alerts.maxlen)
+        self.alerts_by_id = {}
+        self.indices = {field: defaultdict(set) for field in self.INDEXED_FIELDS}
+        for alert in self.alerts:
+            self._index(alert)
+
     def _save_data(self):
         """Save alert tracking data to storage."""
         try:
             with open(self.storage_path, 'w') as f:
                 json.dump({
-                    'alerts': self.alerts,
+                    'alerts': list(self.alerts),
                     'acknowledged_alerts': list(self.acknowledged_alerts),
                     'alert_counter': self.alert_counter,
                     'last_updated': time.time()
@@ -99,10 +131,38 @@ class AlertManager:
                 'status': 'new'  # new, investigating, resolved, false_positive
             }
 
+            if len(self.alerts) == self.alerts.maxlen:
+                evicted = self.alerts[0]
+                self._unindex(evicted)
+                self.acknowledged_alerts.discard(evicted['id'])
+
             self.alerts.append(tracked_alert)
+            self._index(tracked_alert)
             self._save_data()
 
-            return alert_id
+        for listener in self.listeners:
+            try:
+                listener(tracked_alert.copy())
+            except Exception as e:
+                print(f"[AlertManager] Listener failed: {e}")
+
+        return alert_id
+
+    def add_listener(self, callback):
+        """
+        Register a callback to be called with every newly added alert.
+
+        Callbacks run on the thread that added the alert.
+
+        Args:
+            callback: Callable taking the tracked alert dictionary
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener."""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
 
     def acknowledge_alert(self, alert_id, user='system', notes=''):
         """
@@ -117,17 +177,19 @@ class AlertManager:
             Boolean indicating success
         """
         with self.lock:
-            for alert in self.alerts:
-                if alert['id'] == alert_id:
-                    alert['acknowledged'] = True
-                    alert['acknowledged_by'] = user
-                    alert['acknowledged_at'] = time.time()
-                    alert['notes'] = notes
-                    self.acknowledged_alerts.add(alert_id)
-                    self._save_data()
-                    return True
-
-            return False
+            alert = self.alerts_by_id.get(alert_id)
+            if alert is None:
+                return False
+
+            self._unindex(alert)
+            alert['acknowledged'] = True
+            alert['acknowledged_by'] = user
+            alert['acknowledged_at'] = time.time()
+            alert['notes'] = notes
+            self._index(alert)
+            self.acknowledged_alerts.add(alert_id)
+            self._save_data()
+            return True
 
     def update_alert_status(self, alert_id, status, notes=''):
         """
@@ -147,15 +209,17 @@ class AlertManager:
         
 
         with self.lock:
-            for alert in self.alerts:
-                if alert['id'] == alert_id:
-                    alert['status'] = status
-                    if notes:
-                        alert['notes'] = notes
-                    self._save_data()
-                    return True
-
-            return False
+            alert = self.alerts_by_id.get(alert_id)
+            if alert is None:
+                return False
+
+            self._unindex(alert)
+            alert['status'] = status
+            if notes:
+                alert['notes'] = notes
+            self._index(alert)
+            self._save_data()
+            return True
 
     def get_alert(self, alert_id):
         """
@@ -168,11 +232,8 @@ class AlertManager:
             Alert dictionary or None if not found
         """
         with self.lock:
-            for alert in self.alerts:
-                if alert['id'] == alert_id:
-                    return alert.copy()
-
-            return None
+            alert = self.alerts_by_id.get(alert_id)
+            return alert.copy() if alert is not None else None
 
     def get_alerts(self, filters=None, limit=None):
         """
@@ -191,32 +252,26 @@ class AlertManager:
             List of alerts matching the filters
         """
         with self.lock:
-            filtered_alerts = self.alerts.copy()
-
-            if filters:
-                if 'severity' in filters:
-                    filtered_alerts = [a for a in filtered_alerts if a['severity'] == filters['severity']]
-
-                if 'threat' in filters:
-                    filtered_alerts = [a for a in filtered_alerts if a['threat'] == filters['threat']]
-
-                if 'acknowledged' in filters:
-                    ack_filter = filters['acknowledged']
-                    filtered_alerts = [a for a in filtered_alerts if a['acknowledged'] == ack_filter]
-
-                if 'status' in filters:
-                    filtered_alerts = [a for a in filtered_alerts if a['status'] == filters['status']]
-
-                if 'src' in filters:
-                    filtered_alerts = [a for a in filtered_alerts if a['src'] == filters['src']]
-
-            # Sort by timestamp (most recent first)
-            filtered_alerts.sort(key=lambda x: x['timestamp'], reverse=True)
-
+            id_sets = [
+                self.indices[field].get(value, set())
+                for field, value in (filters or {}).items()
+                if field in self.indices
+            ]
+
+            if not id_sets:
+                # Newest first; alerts are stored in arrival order
+                return list(islice(reversed(self.alerts), limit or None))
+
+            # Intersect starting from the smallest matching set
+            id_sets.sort(key=len)
+            matching_ids = set(id_sets[0]).intersection(*id_sets[1:])
+
+            # Highest IDs are the most recent alerts
+            matching_ids = sorted(matching_ids, reverse=True)
             if limit:
-                filtered_alerts = filtered_alerts[:limit]
+                matching_ids = matching_ids[:limit]
 
-            return filtered_alerts
+            return [self.alerts_by_id[alert_id] for alert_id in matching_ids]
 
     def get_unacknowledged_count(self):
         """
@@ -226,7 +281,7 @@ class AlertManager:
             Number of unacknowledged alerts
         """
         with self.lock:
-            return sum(1 for alert in self.alerts if not alert['acknowledged'])
+            return len(self.indices['acknowledged'].get(False, ()))
 
     def get_alerts_by_severity(self):
         """
@@ -236,11 +291,7 @@ class AlertManager:
             Dictionary with severity counts
         """
         with self.lock:
-            severity_counts = defaultdict(int)
-            for alert in self.alerts:
-                severity_counts[alert['severity']] += 1
-
-            return dict(severity_counts)
+            return {severity: len(ids) for severity, ids in self.indices['severity'].items()}
 
     def get_alerts_by_status(self):
         """
@@ -250,11 +301,7 @@ class AlertManager:
             Dictionary with status counts
         """
         with self.lock:
-            status_counts = defaultdict(int)
-            for alert in self.alerts:
-                status_counts[alert['status']] += 1
-
-            return dict(status_counts)
+            return {status: len(ids) for status, ids in self.indices['status'].items()}
 
     def get_recent_alerts(self, count=10):
         """
@@ -282,13 +329,19 @@ class AlertManager:
 
         with self.lock:
             initial_count = len(self.alerts)
-            self.alerts = [a for a in self.alerts if a['timestamp'] >= cutoff_time]
+            self._reset([a for a in self.alerts if a['timestamp'] >= cutoff_time])
             removed_count = initial_count - len(self.alerts)
 
             # Clean up acknowledged set
-            valid_ids = {a['id'] for a in self.alerts}
-            self.acknowledged_alerts = self.acknowledged_alerts.intersection(valid_ids)
+            self.acknowledged_alerts = self.acknowledged_alerts.intersection(self.alerts_by_id)
 
             self._save_data()
 
             return removed_count
+
+    def clear(self):
+        """Remove all tracked alerts."""
+        with self.lock:
+            self._reset([])
+            self.acknowledged_alerts.clear()
+            self._save_data()
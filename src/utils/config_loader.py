@@ -1,5 +1,23 @@
+import os
+from functools import lru_cache
+
 import yaml
 
-def load_config(file_path='config.yaml'):
+# libyaml-backed loader when PyYAML was built with it
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=8)
+def _parse_config(file_path, mtime_ns, size):
     with open(file_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_config(file_path='config.yaml'):
+    """
+    Load a YAML config file, re-parsing only when its mtime or size changes.
+
+    The returned dict is shared between callers; treat it as read-only.
+    """
+    stat = os.stat(file_path)
+    return _parse_config(os.fspath(file_path), stat.st_mtime_ns, stat.st_size)
@@ -1,5 +1,27 @@
 import logging 
+import functools
+import threading
+import time
 
 def setup_logging():
     logging.basicConfig(level=logging.INFO)
-    return logging.getLogger(__name__)
\ No newline at end of file
+    return logging.getLogger(__name__)
+
+def ttl_cache(seconds):
+    """Cache a zero-argument function's result for the given number of seconds."""
+    def decorator(func):
+        lock = threading.Lock()
+        state = {'value': None, 'expires': 0.0}
+
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                now = time.monotonic()
+                if now >= state['expires']:
+                    state['value'] = func()
+                    state['expires'] = now + seconds
+                return state['value']
+
+        wrapper.cache_clear = lambda: state.update(expires=0.0)
+        return wrapper
+    return decorator